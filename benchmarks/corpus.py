@@ -0,0 +1,106 @@
+import pathlib
+import random
+
+import pandas
+import pypdf
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+import string_generator
+
+# real certificate pages appended to every synthetic certificate
+p_fixture = pathlib.Path(__file__).parent.parent / 'test' / 'Calibration Certificate - F1_S1_DS_CDS01_EGC001_FIT209.pdf'
+
+page_width = 595
+page_height = 842
+
+instrument_types = ['FIT', 'PIT', 'TIT', 'LIT']
+common = "704AMX4"
+
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def _add_text_page(writer, lines):
+    page = writer.add_blank_page(page_width, page_height)
+
+    # standard font, no embedding required
+    font = DictionaryObject({
+        NameObject('/Type'): NameObject('/Font'),
+        NameObject('/Subtype'): NameObject('/Type1'),
+        NameObject('/BaseFont'): NameObject('/Helvetica')
+    })
+    page[NameObject('/Resources')] = DictionaryObject({
+        NameObject('/Font'): DictionaryObject({NameObject('/F1'): font})
+    })
+
+    # one text object per line
+    content = "".join(f"BT /F1 {size} Tf {x} {y} Td ({_escape(text)}) Tj ET\n" for x, y, size, text in lines)
+    stream = DecodedStreamObject()
+    stream.set_data(content.encode('latin-1'))
+    page.replace_contents(stream)
+
+
+def _table_lines(top, n_rows):
+    lines = []
+    for row in range(n_rows):
+        y = top - row * 14
+        readings = "  ".join(f"{random.uniform(0, 20):8.4f}" for _ in range(6))
+        lines.append((50, y, 8, f"{row + 1:3d}  {readings}  mA  PASS"))
+    return lines
+
+
+def create_certificate(writer, tag, fixture, table_pages=1, table_rows=50):
+    # header block with the tag, followed by a data table
+    header = [
+        (50, 800, 14, "Calibration Certificate"),
+        (50, 780, 10, f"Tag: {tag}"),
+        (350, 780, 10, "Model: EJA110E")
+    ]
+    _add_text_page(writer, header + _table_lines(740, table_rows))
+
+    # continuation pages with tables only
+    for _ in range(table_pages):
+        _add_text_page(writer, _table_lines(800, table_rows))
+
+    # real certificate pages
+    for page in fixture.pages:
+        writer.add_page(page)
+
+
+def create_corpus(directory, n_pdfs=4, n_groups=2, n_subgroups=6, table_pages=1, table_rows=50, seed=0):
+    """
+    Creates synthetic supplier bundles of table heavy calibration certificates and an instrument index.
+    :param directory: The directory to create the input folder in.
+    :param n_pdfs: The number of bundles to spread the certificates over.
+    :param n_groups: The number of tag groups to generate.
+    :param n_subgroups: The number of tag subgroups per group.
+    :param table_pages: The number of table pages per certificate.
+    :param table_rows: The number of table rows per page.
+    :param seed: The random seed for table contents.
+    :return: The input folder and the list of tags.
+    """
+    random.seed(seed)
+    p_in = pathlib.Path(directory) / 'input'
+    p_in.mkdir(parents=True, exist_ok=True)
+
+    ls_tags = string_generator.generate_tags(instrument_types, common, n_groups, n_subgroups)
+    fixture = pypdf.PdfReader(p_fixture)
+
+    # spread certificates over bundles
+    for idx in range(n_pdfs):
+        writer = pypdf.PdfWriter()
+        for tag in ls_tags[idx::n_pdfs]:
+            create_certificate(writer, tag, fixture, table_pages, table_rows)
+        with open(p_in / f"Bundle {idx + 1:03d}.pdf", 'wb') as output:
+            writer.write(output)
+
+    # instrument index, with one tag that is not in any bundle
+    df = pandas.DataFrame({
+        'Tag No': ls_tags + [f"FIT-{common}00L"],
+        'Supplied By': 'default',
+        'Model': 'EJA110E'
+    })
+    df.to_excel(p_in / 'Synthetic - Instrument Index.xlsx', sheet_name='Instrument Index')
+
+    return p_in, ls_tags
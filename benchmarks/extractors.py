@@ -0,0 +1,64 @@
+# Text extraction backend benchmark
+#
+# Compares throughput of each installed extraction backend, and how often it
+# finds each tag on the same page as pypdf, on the same synthetic corpus.
+#
+# Usage: python -m benchmarks.extractors [header fraction]
+import sys
+import tempfile
+import time
+
+import constants
+import handlers.extractor
+import handlers.pdf
+import handlers.tag
+from benchmarks import corpus
+
+
+def run(p_in, ls_tags, extractor, region):
+    pdfs = handlers.pdf.get_pdfs(p_in, region, extractor=extractor)
+
+    # extract every page once
+    start = time.perf_counter()
+    n_pages = 0
+    for pdf in pdfs:
+        for page_number in range(pdf.number_of_pages):
+            pdf.extract_text(page_number)
+            n_pages += 1
+    extraction_time = time.perf_counter() - start
+
+    # search every tag in every pdf, as Search does
+    start = time.perf_counter()
+    pdfs = handlers.pdf.get_pdfs(p_in, region, extractor=extractor)
+    hits = {}
+    for tag in ls_tags:
+        ls_search = handlers.tag.get_search_strings(tag)
+        for pdf in pdfs:
+            page_number = pdf.search_list(ls_search)
+            if page_number != constants.not_found:
+                hits[tag] = (pdf.name, page_number)
+                break
+    search_time = time.perf_counter() - start
+
+    return extraction_time, search_time, n_pages, hits
+
+
+if __name__ == "__main__":
+    header = float(sys.argv[1]) if len(sys.argv) > 1 else None
+
+    with tempfile.TemporaryDirectory() as directory:
+        p_in, ls_tags = corpus.create_corpus(directory, n_pdfs=2, n_groups=2, n_subgroups=3, table_pages=2)
+
+        results = {}
+        for name, extractor in handlers.extractor.extractors.items():
+            if not extractor.available:
+                print(f"{name:8s} not installed, skipping")
+                continue
+            results[name] = run(p_in, ls_tags, extractor, header)
+
+    reference = results['pypdf'][3]
+    print(f"{len(ls_tags)} tags, {'whole page' if header is None else f'top {header:.0%} of page'}")
+    for name, (extraction_time, search_time, n_pages, hits) in results.items():
+        agreement = sum(hits.get(tag) == reference.get(tag) for tag in ls_tags) / len(ls_tags)
+        print(f"{name:8s} {n_pages / extraction_time:8.1f} pages/s, search {search_time:8.2f}s, "
+              f"{len(hits)} found, agreement with pypdf: {agreement:.0%}")
@@ -0,0 +1,171 @@
+# Performance regression harness
+#
+# Runs the index load, search, split and annotate workloads on a fixed synthetic
+# corpus and compares wall time and peak traced memory against a stored baseline.
+#
+# Usage: python -m benchmarks.perf [--threshold 0.25] [--update]
+import json
+import logging
+import pathlib
+import sys
+import tempfile
+import tracemalloc
+
+import click
+
+import handlers.instrument_index
+import handlers.pdf
+import tools.memtrace
+import tools.search
+import tools.split
+from benchmarks import corpus
+
+p_baseline = pathlib.Path(__file__).parent / 'baseline.json'
+
+# fixed corpus, changing it invalidates the baseline
+corpus_parameters = {
+    'n_pdfs': 3,
+    'n_groups': 1,
+    'n_subgroups': 3,
+    'table_pages': 1,
+    'table_rows': 50,
+    'seed': 0
+}
+
+workloads = ['index load', 'search', 'split', 'annotate']
+
+
+def run_workloads(p_in, p_out, trace):
+    """
+    Runs each workload once inside a trace stage.
+    :param p_in: The corpus input folder.
+    :param p_out: An empty output folder.
+    :param trace: The memory trace to record stages in.
+    """
+    p_index = sorted(p_in.glob('*.xlsx'))[0]
+
+    with trace.stage('index load'):
+        index = handlers.instrument_index.InstrumentIndex(p_index)
+
+    with trace.stage('search'):
+        tools.search.Search(p_in, p_out, index, search_type='tag').run()
+
+    with trace.stage('split'):
+        tools.split.Split('tag', p_in, p_out, index).run()
+
+    # annotate every split pdf with its tags
+    p_annotated = p_out / 'annotated'
+    p_annotated.mkdir()
+    with trace.stage('annotate'):
+        for pdf in handlers.pdf.get_pdfs(p_out):
+            tags = index.get_by_destination(pdf.name)['Tag No'].to_list()
+            pdf.annotate_tags(0, tags, p_annotated / pdf.source.name)
+
+
+def measure(p_in, repeat):
+    """
+    Measures wall time in untraced runs and peak traced memory in a separate traced run.
+    :param p_in: The corpus input folder.
+    :param repeat: The number of timed runs, the fastest is kept.
+    :return: The time and peak memory of each workload.
+    """
+    results = {workload: {} for workload in workloads}
+
+    # tracing slows allocation heavy code down, so time without it
+    for _ in range(repeat):
+        trace = tools.memtrace.MemoryTrace(enabled=False)
+        with tempfile.TemporaryDirectory() as p_out:
+            run_workloads(p_in, pathlib.Path(p_out), trace)
+
+        for record in trace.stages:
+            best = results[record['Stage']].get('time')
+            results[record['Stage']]['time'] = min(best, record['Time (s)']) if best else record['Time (s)']
+
+    trace = tools.memtrace.MemoryTrace(enabled=True, n_top=0)
+    with tempfile.TemporaryDirectory() as p_out:
+        run_workloads(p_in, pathlib.Path(p_out), trace)
+    tracemalloc.stop()
+
+    for record in trace.stages:
+        results[record['Stage']]['peak_mb'] = record['Traced Peak (MB)']
+
+    return results
+
+
+# absolute increases below these are timer and allocator noise, above the 1 ms and 0.001 MB resolution of the
+# trace and well under the smallest baseline
+noise_floor = {
+    'time': 0.002,
+    'peak_mb': 0.05
+}
+
+
+def compare(results, baseline, threshold, memory_threshold, floor=None):
+    """
+    Compares results against the baseline.
+    :param results: The measured time and peak memory of each workload.
+    :param baseline: The baseline time and peak memory of each workload.
+    :param threshold: The allowed relative increase in wall time.
+    :param memory_threshold: The allowed relative increase in peak memory.
+    :param floor: The absolute increase of each metric below which it is not a regression, defaults to the noise floor.
+    :return: The regressions found.
+    """
+    floor = floor if floor is not None else noise_floor
+    regressions = []
+    for workload in workloads:
+        for metric, allowed in [('time', threshold), ('peak_mb', memory_threshold)]:
+            measured = results[workload][metric]
+            expected = baseline.get(workload, {}).get(metric)
+            if expected is None:
+                logging.warning(f"No baseline {metric} for {workload}, skipping...")
+                continue
+
+            change = (measured - expected) / expected if expected else 0.0
+            regressed = change > allowed and measured - expected > floor[metric]
+            status = "REGRESSED" if regressed else "ok"
+            print(f"{workload:12s} {metric:8s} {expected:10.3f} -> {measured:10.3f} ({change:+.1%}) {status}")
+            if regressed:
+                regressions.append((workload, metric, change))
+
+    return regressions
+
+
+@click.command()
+@click.option('--threshold', '-t', type=float, default=0.25, help="Allowed relative increase in wall time.")
+@click.option('--memory-threshold', '-m', type=float, default=0.10, help="Allowed relative increase in peak memory.")
+@click.option('--repeat', '-r', type=click.IntRange(min=1), default=3, help="Timed runs per workload, the fastest is kept.")
+@click.option('--time-floor', type=float, default=noise_floor['time'],
+              help="Increase in seconds below which wall time is not a regression.")
+@click.option('--memory-floor', type=float, default=noise_floor['peak_mb'],
+              help="Increase in MB below which peak memory is not a regression.")
+@click.option('--update', is_flag=True, default=False, help="Store the results as the new baseline.")
+def perf(threshold, memory_threshold, repeat, time_floor, memory_floor, update):
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as directory:
+        p_in, _ = corpus.create_corpus(directory, **corpus_parameters)
+        results = measure(p_in, repeat)
+
+    if update:
+        with open(p_baseline, 'w') as file:
+            json.dump({'corpus': corpus_parameters, 'workloads': results}, file, indent=4)
+            file.write('\n')
+        print(f"Stored baseline in {p_baseline.name}")
+        return
+
+    with open(p_baseline) as file:
+        baseline = json.load(file)
+    if baseline['corpus'] != corpus_parameters:
+        logging.error(f"Baseline was measured on a different corpus, rerun with --update.")
+        sys.exit(2)
+
+    regressions = compare(results, baseline['workloads'], threshold, memory_threshold,
+                          {'time': time_floor, 'peak_mb': memory_floor})
+    if regressions:
+        print(f"{len(regressions)} regressions over threshold.")
+        sys.exit(1)
+    print(f"No regressions.")
+
+
+if __name__ == "__main__":
+    perf()
@@ -0,0 +1,49 @@
+# Region-restricted extraction benchmark
+#
+# Compares searching whole pages against searching only the certificate header
+# on synthetic table heavy certificates.
+#
+# Usage: python -m benchmarks.region [header fraction]
+import sys
+import tempfile
+import time
+
+import constants
+import handlers.pdf
+import handlers.tag
+from benchmarks import corpus
+
+
+def run(p_in, ls_tags, region):
+    start = time.perf_counter()
+
+    # search every tag in every pdf, as Search does
+    pdfs = handlers.pdf.get_pdfs(p_in, region)
+    hits = {}
+    for tag in ls_tags:
+        ls_search = handlers.tag.get_search_strings(tag)
+        for pdf in pdfs:
+            page_number = pdf.search_list(ls_search)
+            if page_number != constants.not_found:
+                hits[tag] = (pdf.name, page_number)
+                break
+
+    execution_time = time.perf_counter() - start
+    n_pages = sum(pdf.number_of_pages for pdf in pdfs)
+    return execution_time, n_pages, hits
+
+
+if __name__ == "__main__":
+    header = float(sys.argv[1]) if len(sys.argv) > 1 else 0.1
+
+    with tempfile.TemporaryDirectory() as directory:
+        p_in, ls_tags = corpus.create_corpus(directory, n_pdfs=2, n_groups=2, n_subgroups=3, table_pages=2)
+
+        full_time, n_pages, full_hits = run(p_in, ls_tags, None)
+        region_time, _, region_hits = run(p_in, ls_tags, header)
+
+    agreement = sum(full_hits.get(tag) == region_hits.get(tag) for tag in ls_tags) / len(ls_tags)
+    print(f"{len(ls_tags)} tags in {n_pages} pages")
+    print(f"whole page:      {full_time:8.2f}s, {len(full_hits)} found")
+    print(f"top {header:.0%} of page: {region_time:8.2f}s, {len(region_hits)} found")
+    print(f"speedup: {full_time / region_time:.2f}x, agreement: {agreement:.0%}")
@@ -12,6 +12,50 @@ df_columns = {
     'split-tag': ['Tag No', 'Supplied By', 'Model'],
     'split-model': ['Tag No', 'Supplied By']
 }
+output_modes = ['files', 'zip', 'tar']
+archive_types = ['zip', 'tar']
+split_archive = 'Split Output'
+search_and_split_output = 'Search and Split Output'
+search_cache = 'Search Cache'
+
+# run store, split destinations are committed in batches
+run_store = 'Run Store'
+store_batch = 100
+
+# split files are written by a pool of threads, splitting waits while the bytes waiting to be written are over the limit
+split_writers = 4
+split_in_flight = 64 * 2 ** 20
+
+# progress events, throttled to one per interval, rates measured over the window in seconds
+progress_interval = 1.0
+progress_window = 60.0
+
+# annotate
+annotate_folder = 'Annotated'
+
+# text extraction backends, pdfium and mupdf are used if their bindings are installed
+extractors = ['pypdf', 'pdfium', 'mupdf']
+
+# sharded search, units are sized by file size so enqueuing does not parse pdfs
+work_queue = 'Work Queue'
+shard_steps = ['enqueue', 'work', 'merge']
+shard_bytes = 256 * 2 ** 20
+queue_claim_timeout = 6 * 60 * 60
+
+# sort
+sort_orders = ['tag', 'model', 'supplier']
+binder_name = 'Turnover Binder'
+binder_folder = 'Binders'
+binder_max_pages = 5000
+binder_unknown = 'Unknown'
+
+# text extraction regions as a fraction of the page height from the top
+# keys are matched against the instrument index name or the supplier, e.g. {'Northvolt': 0.25}
+extraction_regions = {}
+
+# certificate boundary detection
+boundary_header = 0.15
+boundary_title = r"certificate"
 
 # paths
 p_data = pathlib.Path.cwd() / 'data'
@@ -0,0 +1,82 @@
+import csv
+import io
+import logging
+import pathlib
+import tarfile
+import time
+import zipfile
+
+
+class SplitArchive:
+    manifest_name = 'manifest.csv'
+    manifest_columns = ['Member', 'Source', 'First Page', 'Last Page', 'Size']
+
+    def __init__(self, path: pathlib.Path, archive_type: str = 'zip') -> None:
+        self.path = pathlib.Path(path)
+        self.type = archive_type
+
+        # members written so far, in write order
+        self.manifest = []
+        self.members = set()
+
+        self.archive = self._open()
+
+    def _open(self):
+        logging.info(f"Writing split output to {self.type} archive {self.path.name}")
+        if self.type == 'tar':
+            return tarfile.open(self.path, 'w')
+        else:
+            # pdfs are already compressed, store members as they are
+            return zipfile.ZipFile(self.path, 'w', compression=zipfile.ZIP_STORED)
+
+    def _write(self, member: str, data: bytes) -> None:
+        if self.type == 'tar':
+            info = tarfile.TarInfo(member)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            self.archive.addfile(info, io.BytesIO(data))
+        else:
+            self.archive.writestr(member, data)
+
+    def add(self, member: str, data: bytes, source: str, first_page: int, last_page: int) -> bool:
+        """
+        Appends a member to the archive and records it in the manifest.
+        :param member: The member name to write.
+        :param data: The serialised PDF.
+        :param source: The name of the PDF the pages were taken from.
+        :param first_page: The first page of the range.
+        :param last_page: The last page of the range.
+        :return: Whether the member was written successfully.
+        """
+        try:
+            self._write(member, data)
+        except OSError as error:
+            logging.error(f"{error}. Unable to write {member} to {self.path.name}.")
+            return False
+
+        self.members.add(member)
+        self.manifest.append([member, source, int(first_page), int(last_page), len(data)])
+        logging.info(f"Wrote {member} to {self.path.name}!")
+        return True
+
+    def close(self) -> None:
+        """
+        Writes the manifest as the last member and closes the archive.
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.manifest_columns)
+        writer.writerows(self.manifest)
+        self._write(self.manifest_name, buffer.getvalue().encode('utf-8'))
+
+        self.archive.close()
+        logging.info(f"Wrote {len(self.manifest)} members to {self.path.name}!")
+
+    def __contains__(self, member):
+        return member in self.members
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,106 @@
+import bisect
+import hashlib
+import logging
+import re
+
+import constants
+
+
+class BoundaryDetector:
+    # page numbering changes on every page of a certificate and is left out of the header signature
+    page_numbering = re.compile(r"page\s*(\d+)\s*(?:of|/)\s*\d+", re.IGNORECASE)
+
+    def __init__(self, pdf, header=constants.boundary_header, title=constants.boundary_title):
+        """
+        Detects the first page of each certificate in a PDF from a cheap signature of each page.
+        :param pdf: The PDF handler to detect certificates in.
+        :param header: The fraction of the page height from the top to take the header from.
+        :param title: The pattern of the title line of a certificate.
+        """
+        self.pdf = pdf
+        self.header = header
+        self.title = re.compile(title, re.IGNORECASE)
+
+        # certificate first pages found so far, in page order
+        self.starts = []
+
+        # scan state
+        self._next_page = 0
+        self._previous = None
+        self._title_seen = False
+
+    def _get_signature(self, page_number):
+        # page size regardless of orientation, so landscape and rotated pages do not start a certificate
+        box = self.pdf.reader.pages[page_number].mediabox
+        size = tuple(sorted((round(float(box.width)), round(float(box.height)))))
+
+        # page number within the certificate, if the header is numbered
+        header = self.pdf.extract_text(page_number, self.header)
+        numbering = self.page_numbering.search(header)
+        number = int(numbering.group(1)) if numbering else None
+
+        # title line, repeated on continuation pages of some templates
+        title = next((" ".join(line.split()) for line in header.splitlines() if self.title.search(line)), None)
+
+        # header text without page numbering or layout whitespace
+        header = " ".join(self.page_numbering.sub("", header).split())
+        header_hash = hashlib.blake2b(header.encode('utf-8'), digest_size=8).digest()
+
+        return size, header_hash, title, number
+
+    def _is_start(self, signature):
+        # the first page always starts a certificate
+        if self._previous is None:
+            return True
+
+        size, header_hash, title, number = signature
+        previous_size, previous_hash, previous_title, _ = self._previous
+
+        # page size changes between suppliers' templates
+        if size != previous_size:
+            return True
+
+        # numbered headers tell the first page of each certificate apart, even when the title is repeated
+        if number is not None:
+            return number == 1
+
+        # same header as the previous page, e.g. a repeated header on a continuation page
+        if header_hash == previous_hash:
+            return False
+
+        # same title line as the previous page, e.g. a continuation page with its own section header
+        if title is not None and title == previous_title:
+            return False
+
+        # once certificates have title lines, only titled pages start one
+        return title is not None or not self._title_seen
+
+    def _scan(self):
+        page_number = self._next_page
+        signature = self._get_signature(page_number)
+
+        if self._is_start(signature):
+            logging.debug(f"Certificate starts on page {page_number} in {self.pdf.name}")
+            self.starts.append(page_number)
+
+        self._title_seen = self._title_seen or signature[2] is not None
+        self._previous = signature
+        self._next_page += 1
+
+    def get_page_range(self, page_number):
+        """
+        Gets the page range of the certificate containing the page, scanning only as far as the next certificate.
+        :param page_number: A page in the certificate.
+        :return: The first page and the page after the last page of the certificate.
+        """
+        n_pages = self.pdf.number_of_pages
+
+        # scan until a certificate starts after the page
+        while self._next_page < n_pages and (not self.starts or self.starts[-1] <= page_number):
+            self._scan()
+
+        idx = bisect.bisect_right(self.starts, page_number)
+        first_page = self.starts[idx - 1]
+        last_page = self.starts[idx] if idx < len(self.starts) else n_pages
+
+        return first_page, last_page
@@ -0,0 +1,77 @@
+import json
+import logging
+import pathlib
+
+
+class SearchCache:
+    def __init__(self, path: pathlib.Path, options: str = '') -> None:
+        """
+        Persisted search results keyed by PDF content hash and search string.
+        :param path: The cache file.
+        :param options: The extraction settings the results depend on, results stored with other settings are dropped.
+        """
+        self.path = pathlib.Path(path)
+        self.options = options
+
+        # first page each search string was found on as {digest: {search string: page}}, and page count of each pdf
+        self.results, self.pages = self._load()
+
+        self.n_hits = 0
+        self.n_misses = 0
+
+    def _load(self) -> tuple[dict, dict]:
+        if not self.path.is_file():
+            return {}, {}
+
+        try:
+            with open(self.path) as file:
+                cache = json.load(file)
+            options, results, pages = cache['options'], cache['results'], cache['pages']
+        except (OSError, ValueError, KeyError) as error:
+            logging.warning(f"{error}. Unable to read {self.path.name}, starting with an empty cache.")
+            return {}, {}
+
+        # results depend on how text was extracted
+        if options != self.options:
+            logging.info(f"Search settings changed since {self.path.name} was written, starting with an empty cache.")
+            return {}, {}
+
+        logging.info(f"Loaded cached search results for {len(results)} PDFs from {self.path.name}")
+        return results, pages
+
+    @staticmethod
+    def _normalise(text: str) -> str:
+        # layout whitespace does not change the result
+        return " ".join(text.split())
+
+    def get(self, digest: str, text: str) -> int | None:
+        """
+        Gets the cached first page of a search string in a PDF.
+        :param digest: The content hash of the PDF.
+        :param text: The search string.
+        :return: The page number, not found, or None if the search has not been cached.
+        """
+        page_number = self.results.get(digest, {}).get(self._normalise(text))
+        if page_number is None:
+            self.n_misses += 1
+        else:
+            self.n_hits += 1
+        return page_number
+
+    def set(self, digest: str, text: str, page_number: int) -> None:
+        self.results.setdefault(digest, {})[self._normalise(text)] = int(page_number)
+
+    def get_pages(self, digest: str) -> int | None:
+        return self.pages.get(digest)
+
+    def set_pages(self, digest: str, number_of_pages: int) -> None:
+        self.pages[digest] = int(number_of_pages)
+
+    def save(self) -> None:
+        try:
+            with open(self.path, 'w') as file:
+                json.dump({'options': self.options, 'results': self.results, 'pages': self.pages}, file)
+            logging.info(f"Saved search results for {len(self.results)} PDFs to {self.path.name}, "
+                          f"{self.n_hits} cache hits and {self.n_misses} misses.")
+        except OSError as error:
+            logging.error(f"{error}. Unable to write {self.path.name} to file.")
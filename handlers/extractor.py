@@ -0,0 +1,145 @@
+import logging
+
+try:
+    import pypdfium2
+except ImportError:
+    # pdfium backend is not available
+    pypdfium2 = None
+
+try:
+    import pymupdf
+except ImportError:
+    # older pymupdf releases only install the fitz module
+    try:
+        import fitz as pymupdf
+    except ImportError:
+        pymupdf = None
+
+
+class PypdfExtractor:
+    name = 'pypdf'
+    available = True
+
+    def __init__(self, pdf):
+        """
+        Extracts text with pypdf, sharing the reader the PDF handler splits with.
+        :param pdf: The PDF handler to extract text from.
+        """
+        self.pdf = pdf
+
+    def extract_text(self, page_number, region=None):
+        """
+        Extracts the text of a page.
+        :param page_number: The page to extract text from.
+        :param region: The fraction of the page height from the top to extract text from, None extracts the whole page.
+        :return: The page text.
+        """
+        page = self.pdf.reader.pages[page_number]
+
+        # extract whole page
+        if region is None:
+            return page.extract_text()
+
+        # text drawn below this height is outside the region
+        box = page.mediabox
+        y_limit = float(box.top) - float(box.height) * region
+
+        # collect only the text inside the region as it is visited
+        ls_text = []
+
+        def visit_text(text, cm, tm, font_dict, font_size):
+            # text position in user space
+            y = tm[4] * cm[1] + tm[5] * cm[3] + cm[5]
+            if y >= y_limit:
+                ls_text.append(text)
+
+        page.extract_text(visitor_text=visit_text)
+        return "".join(ls_text)
+
+    def close(self):
+        # the reader is shared with splitting and stays open
+        pass
+
+
+class PdfiumExtractor:
+    name = 'pdfium'
+    available = pypdfium2 is not None
+
+    def __init__(self, pdf):
+        self.pdf = pdf
+        self._document = None
+
+    @property
+    def document(self):
+        # opened on first use, like the pypdf reader
+        if self._document is None:
+            self._document = pypdfium2.PdfDocument(self.pdf.source)
+        return self._document
+
+    def extract_text(self, page_number, region=None):
+        page = self.document[page_number]
+        text_page = page.get_textpage()
+
+        # extract whole page
+        if region is None:
+            return text_page.get_text_range()
+
+        # page coordinates start at the bottom left
+        left, bottom, right, top = page.get_bbox()
+        return text_page.get_text_bounded(left, top - (top - bottom) * region, right, top)
+
+    def close(self):
+        # reopened on next use, so a large job does not hold a file handle per pdf
+        if self._document is not None:
+            self._document.close()
+            self._document = None
+
+
+class MupdfExtractor:
+    name = 'mupdf'
+    available = pymupdf is not None
+
+    def __init__(self, pdf):
+        self.pdf = pdf
+        self._document = None
+
+    @property
+    def document(self):
+        if self._document is None:
+            self._document = pymupdf.open(self.pdf.source)
+        return self._document
+
+    def extract_text(self, page_number, region=None):
+        page = self.document[page_number]
+
+        # extract whole page
+        if region is None:
+            return page.get_text()
+
+        # page coordinates start at the top left
+        rect = page.rect
+        return page.get_text(clip=pymupdf.Rect(rect.x0, rect.y0, rect.x1, rect.y0 + rect.height * region))
+
+    def close(self):
+        if self._document is not None:
+            self._document.close()
+            self._document = None
+
+
+extractors = {extractor.name: extractor for extractor in [PypdfExtractor, PdfiumExtractor, MupdfExtractor]}
+
+
+def get_extractor(name):
+    """
+    Gets an installed extraction backend, falling back to pypdf.
+    :param name: The name of the backend.
+    :return: The extractor class.
+    """
+    extractor = extractors.get(name)
+    if extractor is None:
+        logging.error(f"Extractor {name} not recognized, using {PypdfExtractor.name}.")
+        return PypdfExtractor
+    if not extractor.available:
+        logging.error(f"Extractor {name} is not installed, using {PypdfExtractor.name}.")
+        return PypdfExtractor
+    return extractor
@@ -3,13 +3,16 @@ import logging
 import pandas
 
 import handlers.model
+import handlers.pdf
+import handlers.record
 import handlers.tag
 
 
 class InstrumentIndex:
-    def __init__(self, source, supplier=False):
+    def __init__(self, source, supplier=False, dumped=False):
         self.source = source
         self.supplier = supplier
+        self.dumped = dumped
 
         # import dataframe
         self.df = self._import()
@@ -19,6 +22,10 @@ class InstrumentIndex:
 
     def _import(self):
         # TODO add function to handle multiple import options
+        # import a previous dump with all columns
+        if self.dumped:
+            return pandas.read_excel(self.source, sheet_name='Instrument Index', index_col=0)
+
         # import from excel
         # noinspection PyTypeChecker
         df = pandas.read_excel(self.source,
@@ -77,6 +84,10 @@ class InstrumentIndex:
         else:
             return self.df.loc[self.df['Source'] == handlers.EMPTY]
 
+    def get_records(self, return_if_found=False, search=True):
+        # compact records of the tags for the search and split loops
+        return handlers.record.get_records(self.get_tags(return_if_found), search)
+
     def get_by_tag(self, tag_id, return_if_found=False):
         # extract row associated with tag no
         row = self.df.loc[self.df['Tag No'] == tag_id]
@@ -104,7 +115,7 @@ class InstrumentIndex:
 
         # if return_if_found is not set and page has already been found
         # do not return
-        if not return_if_found and rows.at[0, 'Source'] != handlers.EMPTY:
+        if not return_if_found and rows['Source'].iloc[0] != handlers.EMPTY:
             logging.info(f"Model {model_id} has already been found.")
             return False
         else:
@@ -140,22 +151,37 @@ class InstrumentIndex:
 
         return rows
 
+    def get_found(self):
+        # items which have been found in a pdf
+        return self.df.loc[self.df['Source'] != handlers.EMPTY]
+
     def get_no_page_range(self):
         """
         Finds all items which have been found but not assigned a page range.
         :return: Items which have not been assigned a page range.
         """
-        return self.df.loc[self.df['First Page'] != handlers.NOT_FOUND and self.df['Last Page'] == handlers.NOT_FOUND]
+        return self.df.loc[(self.df['First Page'] != handlers.NOT_FOUND) & (self.df['Last Page'] == handlers.NOT_FOUND)]
 
     def update(self, df_update):
         self.df.update(df_update)
 
-    def dump(self, destination):
+    def update_records(self, records):
+        # sync the results of records back to the dataframe
+        if records:
+            self.update(handlers.record.to_frame(records))
+
+    def dump(self, destination, found_only=False):
         # create dump df
         df_dump = self.df.copy()
 
+        # partial results only need the items found
+        if found_only:
+            df_dump = df_dump.loc[df_dump['Source'] != handlers.EMPTY]
+
         # change source to stem only
-        df_dump['Source'] = self.df.apply(lambda row: row['Source'].stem)
+        df_dump['Source'] = df_dump['Source'].apply(
+            lambda source: source.name if isinstance(source, handlers.pdf.PdfHandler) else source
+        )
 
         # write df to file
         df_dump.to_excel(destination, sheet_name='Instrument Index')
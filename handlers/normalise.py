@@ -0,0 +1,35 @@
+import re
+import unicodedata
+
+# hyphens, dashes, soft hyphens, underscores and whitespace, including line breaks inside a tag
+separators = re.compile(r"[-_\s\u00ad\u2010-\u2015\u2212]+")
+
+# separators inside a tag, whitespace is kept so tokens do not run together
+tag_separators = re.compile(r"[-_\u00ad\u2010-\u2015\u2212]+")
+
+# runs of letters and digits joined by dots
+token = re.compile(r"[^\W_]+(?:\.[^\W_]+)*")
+
+# changing the canonical form invalidates cached search results
+form = 'nfkc-casefold-no-separators'
+
+
+def normalise(text):
+    """
+    Canonicalises text for matching, so notations differing only in case, separators, ligatures or line breaks are equal.
+    :param text: The page text or search string.
+    :return: The canonical text.
+    """
+    # ligatures and full width characters become their plain equivalents
+    text = unicodedata.normalize('NFKC', text).casefold()
+    return separators.sub('', text)
+
+
+def tokenise(text):
+    """
+    Splits text into canonical tokens, which equal the canonical form of a search string written on one line.
+    :param text: The page text.
+    :return: The canonical tokens in reading order.
+    """
+    text = unicodedata.normalize('NFKC', text).casefold()
+    return token.findall(tag_separators.sub('', text))
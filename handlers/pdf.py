@@ -1,21 +1,69 @@
 import decimal
+import hashlib
+import io
 import logging
 import pathlib
+import re
 
 import pypdf
 
 import constants
+import handlers.boundary
+import handlers.extractor
+import handlers.normalise
+import handlers.record
+import handlers.tag
 
 
 class PdfHandler:
-    def __init__(self, source):
+    # string operand followed by a text showing operator (Tj, TJ, ' or ")
+    text_operator = re.compile(rb"[)>\]]\s*(?:Tj|TJ|'|\")")
+
+    # limit on nested form xobjects to inspect for text
+    max_form_depth = 3
+
+    def __init__(self, source, region=None, cache=None, extractor=handlers.extractor.PypdfExtractor):
         self.source = pathlib.Path(source)
-        self.reader = pypdf.PdfReader(self.source)
+
+        # reader is opened on first use, so searches resolved from the cache never parse the pdf
+        self._reader = None
+
+        # fraction of the page height from the top to extract text from, None extracts the whole page
+        self.region = region
+
+        # region text is small enough to keep, so each page is only parsed once
+        self._region_text = {}
+
+        # normalised text of each searched page, extracted once and searched for every item until released
+        self._normalised_text = {}
+
+        # pages with a text layer, classified on first search
+        self._text_pages = None
+
+        # certificate start pages, detected on first page range request
+        self._boundaries = None
+
+        # content hash of the file, and pages which duplicate an earlier page as {page: (source, page)}
+        self._digest = None
+        self.duplicate_pages = {}
+
+        # hash of each indirect object as {(idnum, generation): digest}, so resources shared by pages are hashed once
+        self._object_digests = {}
+
+        # search results persisted between runs
+        self.cache = cache
+
+        # text extraction backend, pages are still classified and split with pypdf
+        self.extractor = extractor(self)
 
     def search_list(self, ls_text):
-        # search for all each element in list
-        for text in ls_text:
-            page_number = self.search(text)
+        # notations which normalise to the same string are only searched once, items not applicable are not searched
+        return self.search_keys(handlers.record.get_keys(ls_text))
+
+    def search_keys(self, keys):
+        # canonical search strings, in order of preference
+        for text in keys:
+            page_number = self._search_key(text)
 
             # if text is found, return page number
             if page_number != constants.not_found:
@@ -25,11 +73,30 @@ class PdfHandler:
         return constants.not_found
 
     def search(self, text):
-        # search through pdf by page
-        for page_number, page in enumerate(self.reader.pages):
+        # match case, separator and line break variants alike
+        return self._search_key(handlers.normalise.normalise(text))
+
+    def _search_key(self, text):
+        if not text:
+            return constants.not_found
+
+        # use the result of an earlier run if this pdf has been searched for the text
+        if self.cache is not None:
+            page_number = self.cache.get(self.digest, text)
+            if page_number is not None:
+                return page_number
+
+        page_number = self._search_pages(text)
+        if self.cache is not None:
+            self.cache.set(self.digest, text, page_number)
+        return page_number
 
-            # read text from page
-            page_text = page.extract_text()
+    def _search_pages(self, text):
+        # search through pdf by page, skipping pages without a text layer
+        for page_number in self.text_pages:
+
+            # read normalised text from page
+            page_text = self.get_normalised_text(page_number)
 
             # if found, return page number where text is first found
             if text in page_text:
@@ -39,7 +106,238 @@ class PdfHandler:
         # if not found, return not found
         return constants.not_found
 
-    def split(self, first_page, last_page, path):
+    def search_all(self, keys):
+        """
+        Searches for canonical search strings in one pass over the pages, instead of one pass for each string.
+        :param keys: The canonical search strings.
+        :return: The first page each search string is on, or not found.
+        """
+        results = {}
+        pending = set()
+        for text in keys:
+            # use the result of an earlier run if this pdf has been searched for the text
+            page_number = self.cache.get(self.digest, text) if self.cache is not None and text else None
+            if page_number is not None:
+                results[text] = page_number
+            elif text:
+                pending.add(text)
+            else:
+                results[text] = constants.not_found
+
+        searched = set(pending)
+        if pending:
+            for page_number, page_text, metadata in self.iter_pages(normalised=True):
+                matches = [text for text in pending if text in page_text]
+                for text in matches:
+                    logging.debug(f"Found {text} on page {page_number} in {self.source.name}")
+                    results[text] = page_number
+                pending.difference_update(matches)
+
+                # stop reading pages once all strings are found
+                if not pending:
+                    break
+
+        for text in searched:
+            results.setdefault(text, constants.not_found)
+            if self.cache is not None:
+                self.cache.set(self.digest, text, results[text])
+        return results
+
+    def iter_pages(self, pages=None, region=None, normalised=False):
+        """
+        Streams the text of each page, releasing the page once the next is read so memory does not grow with the
+        number of pages.
+        :param pages: The pages to read, None reads all pages with a text layer which are not duplicates.
+        :param region: The fraction of the page height from the top to read, None uses the handler region.
+        :param normalised: Whether to yield the canonical text used for matching.
+        :return: The page number, text and metadata of each page.
+        """
+        text_pages = set(self.text_pages)
+        if pages is None:
+            pages = self.text_pages
+
+        try:
+            for page_number in pages:
+                text = self.extract_text(page_number, region)
+                if normalised:
+                    text = handlers.normalise.normalise(text)
+
+                box = self.reader.pages[page_number].mediabox
+                metadata = {
+                    'width': float(box.width),
+                    'height': float(box.height),
+                    'has_text': page_number in text_pages
+                }
+
+                # released when the next page is read or the caller stops early
+                try:
+                    yield page_number, text, metadata
+                finally:
+                    self.release_page(page_number)
+
+        # the backend document is reopened if the pdf is read again
+        finally:
+            self.extractor.close()
+
+    def release_page(self, page_number):
+        """
+        Releases the text and parsed content of a page, which are parsed again from the file if the page is read again.
+        :param page_number: The page to release.
+        """
+        self._normalised_text.pop(page_number, None)
+        for key in [key for key in self._region_text if key[0] == page_number]:
+            del self._region_text[key]
+
+        if not self.is_open:
+            return
+
+        # content streams and xobjects are kept by the reader once resolved
+        page = self.reader.pages[page_number]
+        references = []
+        if '/Contents' in page:
+            contents = page.raw_get('/Contents')
+            if isinstance(contents, pypdf.generic.IndirectObject):
+                references.append(contents)
+                contents = contents.get_object()
+            if isinstance(contents, pypdf.generic.ArrayObject):
+                references.extend(contents)
+
+        resources = page.get('/Resources', pypdf.generic.DictionaryObject()).get_object()
+        xobjects = resources.get('/XObject', pypdf.generic.DictionaryObject()).get_object()
+        references.extend(xobjects.raw_get(name) for name in xobjects)
+
+        for reference in references:
+            if isinstance(reference, pypdf.generic.IndirectObject):
+                self.reader.resolved_objects.pop((reference.generation, reference.idnum), None)
+
+    def discover(self, keys):
+        """
+        Scans each page once for tokens and joins them against the canonical search strings.
+        :param keys: The canonical search strings of all items.
+        :return: The first page each search string is on, and the first page of each tag-like token matching no item.
+        """
+        found = {}
+        unindexed = {}
+        for page_number, text, metadata in self.iter_pages():
+            for token in handlers.normalise.tokenise(text):
+                # tokens may carry more of the plant hierarchy than the index, so also look up each dotted suffix
+                parts = token.split('.')
+                matches = [suffix for suffix in ('.'.join(parts[idx:]) for idx in range(len(parts))) if suffix in keys]
+                for match in matches:
+                    found.setdefault(match, page_number)
+
+                if not matches and handlers.tag.is_tag(token):
+                    unindexed.setdefault(token, page_number)
+
+        return found, unindexed
+
+    def extract_text(self, page_number, region=None):
+        # use the handler region unless another region is requested
+        if region is None:
+            region = self.region
+
+        # extract whole page
+        if region is None:
+            return self.extractor.extract_text(page_number)
+
+        if (page_number, region) not in self._region_text:
+            self._region_text[page_number, region] = self.extractor.extract_text(page_number, region)
+        return self._region_text[page_number, region]
+
+    def get_normalised_text(self, page_number):
+        if page_number not in self._normalised_text:
+            self._normalised_text[page_number] = handlers.normalise.normalise(self.extract_text(page_number))
+        return self._normalised_text[page_number]
+
+    def release_text(self):
+        # searched pdfs are kept for splitting, their text is not needed again
+        self._normalised_text = {}
+        self._region_text = {}
+        self.extractor.close()
+
+    def get_page_range(self, page_number):
+        """
+        Gets the page range of the certificate containing the page.
+        :param page_number: A page in the certificate.
+        :return: The first page and the page after the last page of the certificate.
+        """
+        if self._boundaries is None:
+            self._boundaries = handlers.boundary.BoundaryDetector(self)
+        return self._boundaries.get_page_range(page_number)
+
+    def _has_text(self, content, depth=0):
+        """
+        Checks if a page or form xobject draws text without parsing its content stream.
+        :param content: The page or form xobject to check.
+        :param depth: The form xobject nesting depth.
+        :return: Whether the content has fonts and shows text.
+        """
+        resources = content.get('/Resources', pypdf.generic.DictionaryObject()).get_object()
+
+        # text needs a font and a text showing operator in the raw content stream
+        if '/Font' in resources and self.text_operator.search(self._get_content_data(content)):
+            return True
+
+        # text can also be drawn by form xobjects
+        if depth < self.max_form_depth:
+            xobjects = resources.get('/XObject', pypdf.generic.DictionaryObject()).get_object()
+            for xobject in xobjects.values():
+                xobject = xobject.get_object()
+                if xobject.get('/Subtype') == '/Form' and self._has_text(xobject, depth + 1):
+                    return True
+
+        return False
+
+    @staticmethod
+    def _get_content_data(content):
+        # form xobjects are content streams themselves
+        if isinstance(content, pypdf.generic.StreamObject):
+            return content.get_data()
+
+        # page contents can be a single stream or an array of streams
+        contents = content.get('/Contents')
+        if contents is None:
+            return b''
+        contents = contents.get_object()
+        if isinstance(contents, pypdf.generic.ArrayObject):
+            return b'\n'.join(stream.get_object().get_data() for stream in contents)
+        return contents.get_data()
+
+    def _classify_pages(self):
+        text_pages = []
+        for page_number, page in enumerate(self.reader.pages):
+            # duplicate pages have already been searched
+            if page_number in self.duplicate_pages:
+                continue
+
+            if self._has_text(page):
+                text_pages.append(page_number)
+            else:
+                logging.debug(f"Page {page_number} in {self.source.name} has no text layer")
+
+            # content streams are read again when the page is searched
+            self.release_page(page_number)
+        return text_pages
+
+    def hash_page(self, page_number):
+        """
+        Hashes the content of a page and the resources it draws with, without parsing its content stream.
+        :param page_number: The page to hash.
+        :return: The page content hash.
+        """
+        page = self.reader.pages[page_number]
+        page_hash = hashlib.sha256(self._get_content_data(page))
+
+        # same content stream can draw different text with other fonts, or different images or forms
+        if '/Resources' in page:
+            _hash_object(page_hash, page.raw_get('/Resources'), self._object_digests, set())
+
+        # same content at a different size is a different page
+        page_hash.update(repr([float(value) for value in page.mediabox]).encode('utf-8'))
+
+        return page_hash.digest()
+
+    def _extract(self, first_page, last_page):
         # create new writer
         writer = pypdf.PdfWriter()
 
@@ -47,43 +345,50 @@ class PdfHandler:
         for page in range(int(first_page), int(last_page)):
             writer.add_page(self.reader.pages[page])
 
-        # write file to disk
-        try:
-            with open(path, 'wb') as output:
-                writer.write(output)
-            logging.info(f"Wrote {path.name} to {path.parent}!")
-            return True
-
-        # if an error occurs, return False
-        except OSError as error:
-            logging.error(f"{error}. Unable to write {path.name} to file.")
-            return False
-
-    def _annotate(self, page_number, annotation_format, path):
+        return writer
+
+    def serialise(self, first_page, last_page):
+        # serialise in memory, for the split archive or split writer
+        writer = self._extract(first_page, last_page)
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        return buffer.getvalue()
+
+    def split_to_archive(self, first_page, last_page, archive, member):
+        return archive.add(member, self.serialise(first_page, last_page), self.name, first_page, last_page)
+
+    def annotate(self, annotations, path):
+        """
+        Copies the PDF with all annotations added, so a document is rewritten once however many annotations it has.
+        :param annotations: The page number and annotation format of each annotation.
+        :param path: The path to write the annotated PDF to.
+        :return: Whether the annotated PDF was written.
+        """
         # copy pdf
         writer = pypdf.PdfWriter()
         for page in self.reader.pages:
             writer.add_page(page)
 
-        # add annotation to page
-        annotation = pypdf.generic.AnnotationBuilder.free_text(
-            text=annotation_format.text,
-            rect=annotation_format.rect,
-            font=annotation_format.font,
-            bold=annotation_format.bold,
-            italic=annotation_format.italic,
-            font_size=annotation_format.font_size,
-            font_color=annotation_format.font_color,
-            border_color=annotation_format.border_color,
-            background_color=annotation_format.background_color
-        )
-        writer.add_annotation(page_number, annotation)
+        # add annotations to pages
+        for page_number, annotation_format in annotations:
+            annotation = pypdf.generic.AnnotationBuilder.free_text(
+                text=annotation_format.text,
+                rect=annotation_format.rect,
+                font=annotation_format.font,
+                bold=annotation_format.bold,
+                italic=annotation_format.italic,
+                font_size=annotation_format.font_size,
+                font_color=annotation_format.font_color,
+                border_color=annotation_format.border_color,
+                background_color=annotation_format.background_color
+            )
+            writer.add_annotation(page_number, annotation)
 
         # write file to disk
         try:
             with open(path, 'wb') as output:
                 writer.write(output)
-            logging.info(f"Wrote {path.name} to {path.parent}!")
+            logging.info(f"Wrote {path.name} with {len(annotations)} annotations to {path.parent}!")
             return True
 
         # if an error occurs, return False
@@ -92,16 +397,19 @@ class PdfHandler:
             return False
 
     def annotate_tags(self, page_number: int, tags: list[str], path: pathlib.Path) -> bool:
-        # get page height and width
-        box = self.reader.pages[page_number].mediabox
-        page_width = box.width
-        page_height = box.height
+        batch = AnnotationBatch(self)
+        batch.add(page_number, TagsAnnotation, tags)
+        return batch.write(path)
 
-        # get tags annotation formatting
-        tags_annotation = TagsAnnotation(tags, page_height, page_width)
+    @property
+    def reader(self):
+        if self._reader is None:
+            self._reader = pypdf.PdfReader(self.source)
+        return self._reader
 
-        # annotate to new file
-        return self._annotate(page_number, tags_annotation, path)
+    @property
+    def is_open(self):
+        return self._reader is not None
 
     @property
     def name(self):
@@ -109,7 +417,74 @@ class PdfHandler:
 
     @property
     def number_of_pages(self):
-        return len(self.reader.pages)
+        # page count of an unopened pdf is kept with its cached results
+        if self.cache is None:
+            return len(self.reader.pages)
+
+        number_of_pages = None if self.is_open else self.cache.get_pages(self.digest)
+        if number_of_pages is None:
+            number_of_pages = len(self.reader.pages)
+            self.cache.set_pages(self.digest, number_of_pages)
+        return number_of_pages
+
+    @property
+    def text_pages(self):
+        if self._text_pages is None:
+            self._text_pages = self._classify_pages()
+        return self._text_pages
+
+    @property
+    def image_pages(self):
+        text_pages = set(self.text_pages)
+        return [page_number for page_number in range(self.number_of_pages)
+                if page_number not in text_pages and page_number not in self.duplicate_pages]
+
+    @property
+    def digest(self):
+        if self._digest is None:
+            self._digest = hash_file(self.source)
+        return self._digest
+
+
+class AnnotationBatch:
+    def __init__(self, pdf: PdfHandler) -> None:
+        """
+        Collects the annotations of a PDF to write them in one rewrite.
+        :param pdf: The PDF to annotate.
+        """
+        self.pdf = pdf
+
+        # annotations as (page number, annotation format), in drawing order
+        self.annotations = []
+
+        # space taken in each corner of each page, so annotations sharing a corner are stacked
+        self._offsets = {}
+
+    def add(self, page_number: int, annotation_type: type, lines: list[str]) -> None:
+        """
+        Adds an annotation to a page.
+        :param page_number: The page to annotate.
+        :param annotation_type: The annotation format, e.g. TagsAnnotation.
+        :param lines: The lines of text in the annotation.
+        """
+        if not lines:
+            return
+
+        # get page height and width
+        box = self.pdf.reader.pages[page_number].mediabox
+
+        offset = self._offsets.get((page_number, annotation_type.corner), 0)
+        annotation = annotation_type(lines, box.height, box.width, offset)
+        self._offsets[page_number, annotation_type.corner] = offset + annotation.height
+
+        self.annotations.append((page_number, annotation))
+
+    def write(self, path: pathlib.Path) -> bool:
+        return self.pdf.annotate(self.annotations, path)
+
+    @property
+    def length(self):
+        return len(self.annotations)
 
 
 class TagsAnnotation:
@@ -125,11 +500,18 @@ class TagsAnnotation:
     width_scale = 3.6
     text_buffer = 10
 
-    def __init__(self, tags: list[str], page_height: decimal.Decimal, page_width: decimal.Decimal) -> None:
+    # page corner the annotation is drawn in
+    corner = 'top'
+
+    def __init__(self, tags: list[str], page_height: decimal.Decimal, page_width: decimal.Decimal,
+                 offset: float = 0) -> None:
         self.tags = tags
         self.page_width = float(page_width)
         self.page_height = float(page_height)
 
+        # distance from the corner, below or above other annotations in the same corner
+        self.offset = offset
+
         self.width = self._get_box_width()
         self.height = self._get_box_height()
 
@@ -152,25 +534,183 @@ class TagsAnnotation:
     def rect(self):
         # lower left corner coordinates
         x_lower_left = self.page_width - self.width
-        y_lower_left = self.page_height - self.height
+        y_lower_left = self.page_height - self.offset - self.height
 
         # upper right corner coordinates
         x_upper_right = self.page_width
-        y_upper_right = self.page_height
+        y_upper_right = self.page_height - self.offset
 
         return x_lower_left, y_lower_left, x_upper_right, y_upper_right
 
 
-def get_pdfs(directory):
+class ModelsAnnotation(TagsAnnotation):
+    border_color = "4682b4"
+    background_color = "add8e6"
+
+
+class StampAnnotation(TagsAnnotation):
+    border_color = "808080"
+    background_color = "ffffff"
+
+    corner = 'bottom'
+
+    @property
+    def rect(self):
+        # lower right corner of the page
+        x_lower_left = self.page_width - self.width
+        y_lower_left = self.offset
+
+        x_upper_right = self.page_width
+        y_upper_right = self.offset + self.height
+
+        return x_lower_left, y_lower_left, x_upper_right, y_upper_right
+
+
+def _hash_object(object_hash, pdf_object, digests, in_progress):
+    """
+    Hashes a resolved object tree, with the raw bytes of its streams so images are not decoded.
+    :param object_hash: The hash to update.
+    :param pdf_object: The object to hash.
+    :param digests: The digest of each indirect object already hashed in the PDF, so shared objects are hashed once.
+    :param in_progress: The references being hashed, so cyclic references end.
+    """
+    if isinstance(pdf_object, pypdf.generic.IndirectObject):
+        reference = (pdf_object.idnum, pdf_object.generation)
+        if reference not in digests:
+            if reference in in_progress:
+                object_hash.update(b'<cycle>')
+                return
+
+            in_progress.add(reference)
+            reference_hash = hashlib.sha256()
+            _hash_object(reference_hash, pdf_object.get_object(), digests, in_progress)
+            in_progress.discard(reference)
+            digests[reference] = reference_hash.digest()
+
+        object_hash.update(digests[reference])
+        return
+
+    if isinstance(pdf_object, pypdf.generic.DictionaryObject):
+        for key in sorted(pdf_object):
+            # the page tree is not part of the resources
+            if key == '/Parent':
+                continue
+            object_hash.update(key.encode('utf-8'))
+            _hash_object(object_hash, pdf_object.raw_get(key), digests, in_progress)
+        if isinstance(pdf_object, pypdf.generic.StreamObject):
+            object_hash.update(pdf_object._data)
+    elif isinstance(pdf_object, pypdf.generic.ArrayObject):
+        object_hash.update(b'[')
+        for item in pdf_object:
+            _hash_object(object_hash, item, digests, in_progress)
+        object_hash.update(b']')
+    else:
+        object_hash.update(repr(pdf_object).encode('utf-8'))
+
+
+def hash_file(path, chunk_size=1 << 20):
+    # hash in chunks so large bundles are never fully in memory
+    file_hash = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def deduplicate_files(ls_pdf):
+    """
+    Finds PDFs with identical content.
+    :param ls_pdf: The PDF paths in processing order.
+    :return: The digest of each unique PDF, and the original of each duplicate PDF.
+    """
+    digests = {}
+    originals = {}
+    duplicates = {}
+    for pdf in ls_pdf:
+        digest = hash_file(pdf)
+        original = originals.setdefault(digest, pdf)
+        if original == pdf:
+            digests[pdf] = digest
+        else:
+            logging.warning(f"{pdf.name} is a duplicate of {original.name}, skipping...")
+            duplicates[pdf] = original
+    return digests, duplicates
+
+
+def _deduplicate_pages(pdfs):
+    """
+    Marks pages whose content already appeared on an earlier page, in the same or an earlier PDF.
+    :param pdfs: The PDF handlers in processing order.
+    """
+    seen = {}
+    for pdf in pdfs:
+        for page_number in range(pdf.number_of_pages):
+            page_hash = pdf.hash_page(page_number)
+            pdf.release_page(page_number)
+            if page_hash in seen:
+                pdf.duplicate_pages[page_number] = seen[page_hash]
+            else:
+                seen[page_hash] = (pdf.name, page_number)
+
+        if pdf.duplicate_pages:
+            logging.info(f"{len(pdf.duplicate_pages)} pages in {pdf.name} duplicate earlier pages")
+
+
+def get_pdfs(directory, region=None, deduplicate=False, report=None, cache=None, names=None,
+             extractor=handlers.extractor.PypdfExtractor, deduplicate_pages=False):
     # search directory for pdfs
     ls_pdf = sorted(pathlib.Path(directory).glob('*.pdf'))
 
+    # limit to a shard of the directory
+    if names is not None:
+        names = set(names)
+        ls_pdf = [pdf for pdf in ls_pdf if pdf.name in names]
+
     logging.info(f"Found {len(ls_pdf)} PDFs to process in {directory.name}")
+    logging.info(f"Extracting text with {extractor.name}")
+    if region is not None:
+        logging.info(f"Limiting text extraction to the top {region:.0%} of each page")
     logging.debug(f"PDFs in {directory.name}: {ls_pdf}")
 
+    # skip files with identical content
+    duplicates = {}
+    if deduplicate:
+        digests, duplicates = deduplicate_files(ls_pdf)
+        ls_pdf = list(digests)
+
     # instantiate pdf handlers
     pdfs = []
     for pdf in ls_pdf:
-        pdfs.append(PdfHandler(pdf))
+        pdfs.append(PdfHandler(pdf, region, cache, extractor))
+        if deduplicate:
+            pdfs[-1]._digest = digests[pdf]
+
+    if not deduplicate and not deduplicate_pages:
+        return pdfs
+
+    # mark pages already seen in earlier pdfs, cached results must not depend on the other pdfs in the folder
+    if deduplicate_pages and cache is None:
+        _deduplicate_pages(pdfs)
+    elif deduplicate_pages:
+        logging.info(f"Searching duplicate pages so results can be cached per PDF")
+
+    # report skipped files and pages
+    if report is not None:
+        handlers_by_path = {pdf.source: pdf for pdf in pdfs}
+        for duplicate, original in duplicates.items():
+            report.add('Deduplication', {
+                'Source': duplicate.stem,
+                'Duplicate Of': original.stem,
+                'Skipped Bytes': duplicate.stat().st_size,
+                'Skipped Pages': handlers_by_path[original].number_of_pages
+            })
+        for pdf in pdfs:
+            if pdf.duplicate_pages:
+                report.add('Deduplication', {
+                    'Source': pdf.name,
+                    'Duplicate Of': ", ".join(sorted({source for source, _ in pdf.duplicate_pages.values()})),
+                    'Skipped Bytes': 0,
+                    'Skipped Pages': len(pdf.duplicate_pages)
+                })
 
     return pdfs
@@ -0,0 +1,77 @@
+import pandas
+
+import constants
+import handlers.normalise
+
+
+class TagRecord:
+    # slotted, so the search and split loops read attributes instead of indexing pandas rows
+    __slots__ = ('item', 'tag', 'model', 'search', 'first_page', 'last_page', 'source', 'destination')
+
+    def __init__(self, item, tag, model, search, first_page, last_page, source, destination):
+        """
+        Compact record of an index row for the search and split loops.
+        :param item: The index label of the row.
+        :param tag: The tag number.
+        :param model: The model number.
+        :param search: The canonical search strings, in order of preference.
+        :param first_page: The first page of the item.
+        :param last_page: The last page of the item.
+        :param source: The PDF the item was found in.
+        :param destination: The split PDF the item was written to.
+        """
+        self.item = item
+        self.tag = tag
+        self.model = model
+        self.search = search
+        self.first_page = first_page
+        self.last_page = last_page
+        self.source = source
+        self.destination = destination
+
+    @property
+    def found(self):
+        return self.first_page != constants.not_found
+
+
+def get_keys(ls_search):
+    """
+    Gets the canonical search strings of an item, notations which normalise to the same string are only kept once.
+    :param ls_search: The search strings of the item.
+    :return: The canonical search strings, items not applicable are not searched.
+    """
+    if not isinstance(ls_search, (list, tuple)):
+        return ()
+    return tuple(dict.fromkeys(handlers.normalise.normalise(text) for text in ls_search
+                               if text != constants.not_applicable))
+
+
+def get_records(df, search=True):
+    """
+    Gets the records of the rows, without iterating over pandas rows.
+    :param df: The index rows.
+    :param search: Whether to precompute the canonical search strings.
+    :return: The records of the rows.
+    """
+    ls_search = df['Search'] if search else [()] * len(df.index)
+    return [
+        TagRecord(item, tag, model, get_keys(search_strings), int(first_page), int(last_page), source, destination)
+        for item, tag, model, search_strings, first_page, last_page, source, destination in zip(
+            df.index, df['Tag No'], df['Model'], ls_search, df['First Page'], df['Last Page'], df['Source'],
+            df['Destination']
+        )
+    ]
+
+
+def to_frame(records):
+    """
+    Gets the results of the records as index rows.
+    :param records: The records to sync back to the index.
+    :return: The page range, source and destination of each record.
+    """
+    return pandas.DataFrame({
+        'First Page': [record.first_page for record in records],
+        'Last Page': [record.last_page for record in records],
+        'Source': [record.source for record in records],
+        'Destination': [record.destination for record in records]
+    }, index=[record.item for record in records])
@@ -0,0 +1,36 @@
+import logging
+
+import pandas
+
+
+class RunReport:
+    def __init__(self):
+        # records for each report section, written to one sheet per section
+        self.sections = {}
+
+    def add(self, section: str, record: dict) -> None:
+        """
+        Adds a record to a section of the report.
+        :param section: The section to add the record to.
+        :param record: The column values of the record.
+        """
+        self.sections.setdefault(section, []).append(record)
+
+    def get(self, section: str) -> pandas.DataFrame:
+        """
+        Gets the records of a section.
+        :param section: The section to get.
+        :return: The records of the section.
+        """
+        return pandas.DataFrame(self.sections.get(section, []))
+
+    def dump(self, destination):
+        # nothing to report
+        if not self.sections:
+            return
+
+        # write each section to a sheet
+        with pandas.ExcelWriter(destination) as writer:
+            for section in self.sections:
+                self.get(section).to_excel(writer, sheet_name=section, index=False)
+        logging.info(f"Wrote run report to {destination.name}!")
@@ -0,0 +1,170 @@
+import json
+import logging
+import pathlib
+import sqlite3
+
+import pandas
+
+import constants
+import handlers.pdf
+
+
+class RunStore:
+    schema = """
+        CREATE TABLE IF NOT EXISTS run (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS items (
+            item INTEGER PRIMARY KEY,
+            tag TEXT,
+            model TEXT,
+            first_page INTEGER,
+            last_page INTEGER,
+            source TEXT,
+            destination TEXT
+        );
+        CREATE INDEX IF NOT EXISTS items_source ON items (source);
+        CREATE INDEX IF NOT EXISTS items_destination ON items (destination);
+        CREATE TABLE IF NOT EXISTS sources (name TEXT PRIMARY KEY, pages INTEGER);
+    """
+
+    def __init__(self, path: pathlib.Path, options: dict, reset_destinations: bool = False,
+                 batch_size: int = constants.store_batch) -> None:
+        """
+        SQLite store of the search and split state of a run, committed as it progresses so a run can be resumed.
+        :param path: The database file.
+        :param options: The run options, a store written with other options is discarded.
+        :param reset_destinations: Whether to split again on resume, e.g. when the split archive is rewritten.
+        :param batch_size: The number of split destinations committed per transaction.
+        """
+        self.path = pathlib.Path(path)
+        self.reset_destinations = reset_destinations
+        self.options = json.dumps(options, sort_keys=True, default=str)
+        self.batch_size = batch_size
+
+        # split destinations waiting to be committed as (destination, item)
+        self._destinations = []
+
+        self.connection = sqlite3.connect(self.path)
+        self.connection.executescript("PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;")
+        self.connection.executescript(self.schema)
+
+        # a store from a run with other options cannot be resumed
+        row = self.connection.execute("SELECT value FROM run WHERE key = 'options'").fetchone()
+        if row is not None and row[0] != self.options:
+            logging.warning(f"Run options changed since {self.path.name} was written, starting a new run.")
+            self._clear()
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO run VALUES ('options', ?)", (self.options,))
+
+    def _clear(self) -> None:
+        with self.connection:
+            self.connection.execute("DELETE FROM items")
+            self.connection.execute("DELETE FROM sources")
+
+    @staticmethod
+    def _get_value(value):
+        # sqlite stores python types only
+        if isinstance(value, handlers.pdf.PdfHandler):
+            return value.name
+        # blank cells are NA, which cannot be compared
+        if pandas.api.types.is_scalar(value) and pandas.isna(value):
+            return None
+        if value in (constants.empty, constants.not_found):
+            return None
+        if isinstance(value, str):
+            return value
+        return int(value)
+
+    def load(self, index, pdfs: list) -> set[str]:
+        """
+        Restores the committed state of an earlier run into the index.
+        :param index: The instrument index of this run.
+        :param pdfs: The PDF handlers of this run, to restore as sources.
+        :return: The names of the PDFs which have been searched.
+        """
+        # add index rows on the first run
+        if self.connection.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0:
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT INTO items (item, tag, model) VALUES (?, ?, ?)",
+                    [(int(idx), self._get_value(row['Tag No']), self._get_value(row['Model']))
+                     for idx, row in index.df.iterrows()]
+                )
+            return set()
+
+        # failed splits are split again
+        with self.connection:
+            if self.reset_destinations:
+                self.connection.execute("UPDATE items SET destination = NULL")
+            else:
+                self.connection.execute("UPDATE items SET destination = NULL WHERE destination = ?",
+                                        (constants.error,))
+
+        searched = {name for name, in self.connection.execute("SELECT name FROM sources")}
+
+        # restore items found in searched pdfs of this run
+        sources = {pdf.name: pdf for pdf in pdfs}
+        frames = [rows for rows in map(self.get_by_source, sources) if not rows.empty]
+        df = pandas.concat(frames) if frames else pandas.DataFrame()
+        if not df.empty:
+            restored = pandas.DataFrame({
+                'First Page': df['first_page'].astype(int),
+                'Last Page': df['last_page'].fillna(constants.not_found).astype(int),
+                'Source': df['source'].map(sources),
+                'Destination': df['destination'].fillna(constants.empty)
+            }, index=df.index)
+            index.update(restored)
+
+        logging.info(f"Resuming from {self.path.name}, {len(searched)} PDFs searched and {len(df)} items found.")
+        return searched
+
+    def save_source(self, pdf, rows: pandas.DataFrame) -> None:
+        """
+        Commits the items found in a searched PDF and marks it searched, in one transaction.
+        :param pdf: The searched PDF.
+        :param rows: The items found in the PDF.
+        """
+        with self.connection:
+            self._update_items(rows)
+            self.connection.execute("INSERT OR REPLACE INTO sources VALUES (?, ?)", (pdf.name, pdf.number_of_pages))
+
+    def save_items(self, rows: pandas.DataFrame) -> None:
+        with self.connection:
+            self._update_items(rows)
+
+    def _update_items(self, rows: pandas.DataFrame) -> None:
+        self.connection.executemany(
+            "UPDATE items SET first_page = ?, last_page = ?, source = ?, destination = ? WHERE item = ?",
+            [(self._get_value(row['First Page']), self._get_value(row['Last Page']), self._get_value(row['Source']),
+              self._get_value(row['Destination']), int(idx))
+             for idx, row in rows.iterrows()]
+        )
+
+    def add_destination(self, item, destination: str) -> None:
+        """
+        Records the destination of a split item, committed in batches.
+        :param item: The index of the item.
+        :param destination: The destination it was split to.
+        """
+        self._destinations.append((self._get_value(destination), int(item)))
+        if len(self._destinations) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        with self.connection:
+            self.connection.executemany("UPDATE items SET destination = ? WHERE item = ?", self._destinations)
+        self._destinations = []
+
+    def get_by_source(self, source: str) -> pandas.DataFrame:
+        """
+        Gets the committed items found in a PDF, from the source index.
+        :param source: The name of the PDF.
+        :return: The page range, source and destination of the items, sorted by first page.
+        """
+        return pandas.read_sql_query(
+            "SELECT item, first_page, last_page, source, destination FROM items WHERE source = ? ORDER BY first_page",
+            self.connection, params=(source,), index_col='item'
+        )
+
+    def close(self) -> None:
+        self.flush()
+        self.connection.close()
@@ -21,7 +21,7 @@ class Instrument:
 
         # match 2-3 characters before or after -/_
         match = re.search(
-            rf"[{measured_variables}][{readout_variables}][{output_variables}]?(?=[{separators}]|(?<=[{separators}])[{measured_variables}][{readout_variables}][{output_variables}]?",
+            rf"[{measured_variables}][{readout_variables}][{output_variables}]?(?=[{separators}])|(?<=[{separators}])[{measured_variables}][{readout_variables}][{output_variables}]?",
             self.tag
         )
 
@@ -38,7 +38,7 @@ class Instrument:
             instrument_type = {
                 'measurement': measured_variable[variables[0]],
                 'readout': readout_variable[variables[1]],
-                'output': readout_variable[variables[2]]
+                'output': output_variable[variables[2]]
             }
         except IndexError as error:
             # if id only has 1 succeeding letter
@@ -161,3 +161,14 @@ output_variable = {
     'Y': 'Auxiliary Devices',
     'Z': 'Driver, Actuator, Unclassified final control element'
 }
+
+
+# isa identification and loop number ending a canonical token, e.g. cma001fit100
+isa_pattern = re.compile(
+    rf"(?<![a-z])[{''.join(measured_variable).lower()}][{''.join(readout_variable).lower()}]"
+    rf"[{''.join(output_variable).lower()}]?\d+[a-z]?$"
+)
+
+
+def is_tag(token):
+    return isa_pattern.search(token) is not None
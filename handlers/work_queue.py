@@ -0,0 +1,143 @@
+import json
+import logging
+import os
+import pathlib
+import socket
+import time
+
+import constants
+
+
+class WorkQueue:
+    states = ['pending', 'claimed', 'done']
+
+    def __init__(self, directory, claim_timeout=constants.queue_claim_timeout):
+        """
+        Work queue on a shared directory. Units move between state folders by atomic renames, so any number of
+        workers on any number of hosts can consume it without a lock server.
+        :param directory: The queue directory, shared between all workers.
+        :param claim_timeout: The seconds after which a claimed unit is assumed abandoned and can be claimed again.
+        """
+        self.directory = pathlib.Path(directory)
+        self.claim_timeout = claim_timeout
+        self.results = self.directory / 'results'
+
+        # unique across hosts sharing the queue, dots separate the parts of queue file names
+        self.worker = f"{socket.gethostname()}-{os.getpid()}".replace('.', '_')
+
+    def create(self, units: list[list[str]], options: dict) -> bool:
+        """
+        Creates the queue with a pending unit for each shard.
+        :param units: The PDF names in each unit.
+        :param options: The search options every worker runs with.
+        :return: Whether the queue was created.
+        """
+        if (self.directory / 'queue.json').is_file():
+            logging.error(f"A work queue already exists in {self.directory}, remove it before enqueuing again.")
+            return False
+
+        for folder in [*self.states, 'results']:
+            (self.directory / folder).mkdir(parents=True, exist_ok=True)
+
+        for n, pdfs in enumerate(units):
+            self._write(self.directory / 'pending' / f"unit-{n:05d}.json", {'unit': n, 'pdfs': pdfs})
+
+        # options are written last, workers wait for a complete queue
+        self._write(self.directory / 'queue.json', options)
+        logging.info(f"Enqueued {len(units)} units in {self.directory}")
+        return True
+
+    @staticmethod
+    def _write(path: pathlib.Path, data: dict) -> None:
+        # write then rename, so other workers never read a partial file
+        temporary = path.with_name(f".{path.name}.tmp")
+        with open(temporary, 'w') as file:
+            json.dump(data, file)
+        os.replace(temporary, path)
+
+    @property
+    def options(self) -> dict | None:
+        try:
+            with open(self.directory / 'queue.json') as file:
+                return json.load(file)
+        except OSError:
+            return None
+
+    def _get_stale(self) -> list[pathlib.Path]:
+        now = time.time()
+        stale = []
+        for path in sorted((self.directory / 'claimed').glob('*.json')):
+            try:
+                if now - path.stat().st_mtime > self.claim_timeout:
+                    stale.append(path)
+            except FileNotFoundError:
+                continue
+        return stale
+
+    def claim(self) -> dict | None:
+        """
+        Claims the next pending unit, or a unit whose claim has timed out.
+        :return: The unit or None if there is nothing left to claim.
+        """
+        for path in sorted((self.directory / 'pending').glob('*.json')) + self._get_stale():
+            unit_name = path.name.split('.')[0]
+            claim = self.directory / 'claimed' / f"{unit_name}.{self.worker}.json"
+
+            # only one worker can rename the file, the others move on to the next unit
+            try:
+                os.rename(path, claim)
+            except FileNotFoundError:
+                continue
+
+            # renaming keeps the modification time, the claim age starts now
+            os.utime(claim)
+            if path.parent.name == 'claimed':
+                logging.warning(f"Claim on {unit_name} timed out, claimed it again.")
+
+            with open(claim) as file:
+                unit = json.load(file)
+            unit['name'] = unit_name
+            unit['claim'] = claim
+            logging.info(f"{self.worker} claimed {unit_name} with {len(unit['pdfs'])} PDFs")
+            return unit
+
+        return None
+
+    def get_result_path(self, unit: dict, suffix: str = '') -> pathlib.Path:
+        return self.results / f"{unit['name']}{suffix}.xlsx"
+
+    def get_temporary_path(self, unit: dict, suffix: str = '') -> pathlib.Path:
+        # results of a unit claimed twice must not be interleaved
+        return self.results / f".{unit['name']}{suffix}.{self.worker}.xlsx"
+
+    def complete(self, unit: dict) -> bool:
+        """
+        Publishes the results written by this worker and marks a claimed unit as done.
+        :param unit: The claimed unit.
+        :return: Whether the claim was still held.
+        """
+        for temporary in self.results.glob(f".{unit['name']}*.{self.worker}.xlsx"):
+            os.replace(temporary, self.results / temporary.name[1:].replace(f".{self.worker}", ''))
+
+        try:
+            os.rename(unit['claim'], self.directory / 'done' / unit['claim'].name)
+            return True
+        except FileNotFoundError:
+            logging.warning(f"Claim on {unit['name']} was taken over by another worker.")
+            return False
+
+    def get_status(self) -> dict:
+        return {state: len(list((self.directory / state).glob('*.json'))) for state in self.states}
+
+    def get_done(self) -> list[dict]:
+        """
+        Gets the completed units and the worker which completed them.
+        :return: The completed units in unit order.
+        """
+        done = []
+        for path in sorted((self.directory / 'done').glob('*.json')):
+            with open(path) as file:
+                unit = json.load(file)
+            unit['name'], unit['worker'] = path.name.split('.', 2)[:2]
+            done.append(unit)
+        return done
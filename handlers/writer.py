@@ -0,0 +1,63 @@
+import concurrent.futures
+import logging
+import pathlib
+import threading
+
+import constants
+
+
+class SplitWriter:
+    def __init__(self, n_threads: int = constants.split_writers, max_bytes: int = constants.split_in_flight) -> None:
+        """
+        Writes serialised PDFs to files in parallel, so slow shares do not hold up splitting.
+        :param n_threads: The number of files written at once.
+        :param max_bytes: The bytes submitted but not yet written, above which submitting waits for writes to finish.
+        """
+        self.max_bytes = max_bytes
+        self.executor = concurrent.futures.ThreadPoolExecutor(n_threads, thread_name_prefix='split-writer')
+
+        # bytes submitted but not written yet
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+        # write of each path submitted, so a file is not written twice before it exists
+        self.writes = {}
+
+    def submit(self, path: pathlib.Path, data: bytes) -> concurrent.futures.Future:
+        """
+        Queues a serialised PDF to be written, waiting while the in-flight bytes are over the limit.
+        :param path: The path to write to.
+        :param data: The serialised PDF.
+        :return: A future of whether the file was written.
+        """
+        with self._condition:
+            # a buffer larger than the limit is written on its own
+            self._condition.wait_for(lambda: self.in_flight == 0 or self.in_flight + len(data) <= self.max_bytes)
+            self.in_flight += len(data)
+
+        self.writes[path] = self.executor.submit(self._write, path, data)
+        return self.writes[path]
+
+    def _write(self, path: pathlib.Path, data: bytes) -> bool:
+        try:
+            with open(path, 'wb') as output:
+                output.write(data)
+            logging.info(f"Wrote {path.name} to {path.parent}!")
+            return True
+
+        # if an error occurs, return False
+        except OSError as error:
+            logging.error(f"{error}. Unable to write {path.name} to file.")
+            return False
+
+        finally:
+            with self._condition:
+                self.in_flight -= len(data)
+                self._condition.notify_all()
+
+    def close(self) -> None:
+        # wait for all writes to finish
+        self.executor.shutdown(wait=True)
+
+    def __contains__(self, path: pathlib.Path) -> bool:
+        return path in self.writes
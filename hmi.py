@@ -37,6 +37,8 @@ def get_tool(pattern):
         return 'split'
     elif pattern == 'searchsplit' or pattern == 'ss':
         return 'search and split'
+    elif pattern == 'sort' or pattern == 'o':
+        return 'sort'
     else:
         logging.error(f"No tool selection for {pattern}.")
         return False
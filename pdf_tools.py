@@ -1,4 +1,5 @@
 import logging
+import pathlib
 
 import click
 
@@ -13,7 +14,7 @@ import tools
               prompt="Data to process",
               help="The data to process.")
 @click.option('--tool', '-T',
-              type=click.Choice(['annotate', 'search', 'split', 'searchsplit']),
+              type=click.Choice(['annotate', 'search', 'split', 'searchsplit', 'sort']),
               required=True,
               prompt="Tool to run",
               help="The tool to run on the batch.")
@@ -25,12 +26,102 @@ import tools
 @click.option('--supplier', '-S',
               required=False,
               help="Limits the instrument index to the supplier.")
+@click.option('--output', '-O',
+              type=click.Choice(constants.output_modes),
+              default='files',
+              required=False,
+              help="Write split PDFs as separate files or stream them into a single archive.")
+@click.option('--region', '-R',
+              type=click.FloatRange(0, 1, min_open=True),
+              required=False,
+              help="Only search the top fraction of each page, e.g. 0.25 for certificate headers.")
+@click.option('--boundaries', '-B',
+              is_flag=True,
+              default=False,
+              help="Take page ranges from detected certificate boundaries and split while searching.")
+@click.option('--deduplicate/--no-deduplicate',
+              default=True,
+              help="Skip PDFs whose content has already been searched.")
+@click.option('--deduplicate-pages',
+              is_flag=True,
+              default=False,
+              help="Also skip pages whose content and resources match an earlier page.")
+@click.option('--cache',
+              is_flag=True,
+              default=False,
+              help="Reuse search results from earlier runs for unchanged PDFs and search strings.")
+@click.option('--store',
+              is_flag=True,
+              default=False,
+              help="Commit results to a SQLite run store as the run progresses, and resume an interrupted run.")
+@click.option('--extractor',
+              type=click.Choice(constants.extractors),
+              default='pypdf',
+              required=False,
+              help="The text extraction backend, pdfium and mupdf need pypdfium2 or pymupdf installed.")
+@click.option('--discover',
+              is_flag=True,
+              default=False,
+              help="Find tags by scanning each page once for ISA tag-like tokens, and report tags missing from the index. "
+                   "Only matches tags written on one line.")
+@click.option('--shard',
+              type=click.Choice(constants.shard_steps),
+              required=False,
+              help="Run one step of a sharded search and split: enqueue work units, work on them, or merge the results.")
+@click.option('--queue',
+              type=click.Path(file_okay=False, path_type=pathlib.Path),
+              required=False,
+              help="The work queue directory, shared between hosts. Defaults to the output folder.")
+@click.option('--workers',
+              type=click.IntRange(min=1),
+              default=1,
+              required=False,
+              help="The number of local processes to run sharded search workers or annotation in.")
+@click.option('--writers',
+              type=click.IntRange(min=1),
+              default=constants.split_writers,
+              required=False,
+              help="The number of split PDFs written at once, more hide the write latency of network shares.")
+@click.option('--write-buffer',
+              type=click.IntRange(min=1),
+              default=constants.split_in_flight // 2 ** 20,
+              required=False,
+              help="The megabytes of split PDFs waiting to be written, above which splitting waits for writes.")
+@click.option('--annotate', '-A',
+              type=click.Choice(['tag', 'model']),
+              multiple=True,
+              required=False,
+              help="The item types to annotate split PDFs with, repeat for several. Defaults to the split type.")
+@click.option('--stamp',
+              is_flag=True,
+              default=False,
+              help="Stamp every page of annotated PDFs with the PDF name and page number.")
+@click.option('--order',
+              type=click.Choice(constants.sort_orders),
+              default='tag',
+              required=False,
+              help="Sort into one binder ordered by tag, or one binder per model or supplier.")
+@click.option('--volume-pages',
+              type=click.IntRange(min=0),
+              default=constants.binder_max_pages,
+              required=False,
+              help="Continue binders in a new volume after this many pages, 0 for no limit.")
+@click.option('--memtrace',
+              is_flag=True,
+              default=False,
+              help="Record peak memory and top allocation sites of each stage in the run report.")
+@click.option('--progress',
+              type=click.Path(dir_okay=False, path_type=pathlib.Path),
+              required=False,
+              help="Append progress events to this JSON lines file.")
 @click.option('--log', '-L',
               type=click.Choice(['debug', 'info', 'warning', 'error']),
               default='warning',
               required=False,
               help="Log level to set.")
-def pdf_tools(data, tool, stype, supplier, log):
+def pdf_tools(data, tool, stype, supplier, output, region, boundaries, deduplicate, deduplicate_pages, cache, store, extractor, discover, shard, queue,
+              workers, writers, write_buffer, annotate, stamp, order, volume_pages, memtrace, progress,
+              log):
     if log == 'debug':
         # set log level
         logging.basicConfig(level=logging.DEBUG)
@@ -59,9 +150,22 @@ def pdf_tools(data, tool, stype, supplier, log):
     p_in = p_data / "input"
     p_out = p_data / "output"
 
+    # progress events are logged, and written to file if set
+    progress = tools.progress.Progress(path=progress)
+
     # run tool
-    if tool == 'search and split':
-        tools.search_and_split(p_in, p_out, stype, supplier)
+    if tool == 'search and split' and shard:
+        tools.search_and_split_sharded(shard, p_in, p_out, stype, supplier, output, region, boundaries, deduplicate,
+                                       queue, workers, memtrace, extractor, discover, progress, writers,
+                                       write_buffer * 2 ** 20, deduplicate_pages)
+    elif tool == 'search and split':
+        tools.search_and_split(p_in, p_out, stype, supplier, output, region, boundaries, deduplicate, memtrace,
+                               cache, extractor, discover, progress, store, writers, write_buffer * 2 ** 20,
+                               deduplicate_pages)
+    elif tool == 'annotate':
+        tools.annotate_split(p_out, annotate or [stype], stamp, workers, memtrace, progress)
+    elif tool == 'sort':
+        tools.sort_binders(p_out, order, volume_pages, memtrace, progress)
 
 
 if __name__ == '__main__':
@@ -2,6 +2,18 @@ import pathlib
 
 import pandas
 
+
+def generate_tags(instrument_types, common, n_groups, n_subgroups):
+    ls_tags = list()
+
+    for group in range(1, n_groups + 1):
+        for subgroup in range(1, n_subgroups + 1):
+            for instrument in instrument_types:
+                ls_tags.append(f"{instrument}-{common}{group}{subgroup}L")
+
+    return ls_tags
+
+
 if __name__ == "__main__":
     p_out = pathlib.Path.cwd() / 'misc' / 'Morenci - Instrument Index.xlsx'
 
@@ -10,12 +22,7 @@ if __name__ == "__main__":
     n_groups = 2
     n_subgroups = 6
 
-    ls_tags = list()
-
-    for group in range(1, n_groups + 1):
-        for subgroup in range(1, n_subgroups + 1):
-            for instrument in instrument_types:
-                ls_tags.append(f"{instrument}-704AMX4{group}{subgroup}L")
+    ls_tags = generate_tags(instrument_types, common, n_groups, n_subgroups)
 
     d = {
         'Tag No': ls_tags,
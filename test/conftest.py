@@ -0,0 +1,27 @@
+import pathlib
+import sys
+
+import pandas
+import pytest
+
+# the tools are run from the repository root
+root = pathlib.Path(__file__).parent.parent
+sys.path.insert(0, str(root))
+
+import handlers.instrument_index
+
+
+@pytest.fixture
+def make_index(tmp_path):
+    def make_index(rows):
+        """
+        Writes an instrument index with the rows and imports it.
+        :param rows: The Tag No, Supplied By and Model of each item.
+        :return: The instrument index.
+        """
+        path = tmp_path / 'Test - Instrument Index.xlsx'
+        df = pandas.DataFrame(rows, columns=['Tag No', 'Supplied By', 'Model'])
+        df.to_excel(path, sheet_name='Instrument Index', index=False)
+        return handlers.instrument_index.InstrumentIndex(path)
+
+    return make_index
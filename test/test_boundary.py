@@ -0,0 +1,27 @@
+import pathlib
+
+import pypdf
+
+import handlers.boundary
+import handlers.pdf
+
+p_fixture = pathlib.Path(__file__).parent / 'Calibration Certificate - F1_S1_DS_CDS01_EGC001_FIT209.pdf'
+
+
+def test_two_page_certificate():
+    pdf = handlers.pdf.PdfHandler(p_fixture)
+    detector = handlers.boundary.BoundaryDetector(pdf)
+
+    assert detector.get_page_range(0) == (0, 2)
+    assert detector.get_page_range(1) == (0, 2)
+
+
+def test_rotated_page(tmp_path):
+    # a rotated continuation page is the same page size
+    writer = pypdf.PdfWriter(clone_from=p_fixture)
+    writer.pages[1].rotate(90)
+    path = tmp_path / 'rotated.pdf'
+    writer.write(path)
+
+    detector = handlers.boundary.BoundaryDetector(handlers.pdf.PdfHandler(path))
+    assert detector.get_page_range(0) == (0, 2)
@@ -0,0 +1,50 @@
+import pypdf
+
+import constants
+import tools.search
+import tools.split
+from benchmarks import corpus
+
+
+def make_bundle(p_in, models):
+    # one certificate page per model
+    writer = pypdf.PdfWriter()
+    for model in models:
+        corpus._add_text_page(writer, [(50, 800, 14, "Calibration Certificate"), (50, 780, 10, f"Model: {model}")])
+    with open(p_in / 'Bundle 001.pdf', 'wb') as output:
+        writer.write(output)
+
+
+def test_search_models(tmp_path, make_index):
+    index = make_index([
+        ['F1.S1.DS.CDS01.CMA001_FIT100', 'Endress', 'TMT82'],
+        ['F1.S1.DS.CDS01.CMA001_PIT101', 'Emerson', '3051S'],
+        ['F1.S1.DS.CDS01.CMA001_TIT102', 'Emerson', '3051S'],
+        ['F1.S1.DS.CDS01.CMA001_LIT103', 'Yokogawa', 'EJA110E'],
+    ])
+    make_bundle(tmp_path, ['TMT82', '3051S'])
+
+    tools.search.Search(tmp_path, tmp_path, index, search_type='model').run()
+    assert index.df['First Page'].to_list() == [0, 1, 1, constants.not_found]
+    assert index.df['Last Page'].to_list() == [1, 2, 2, constants.not_found]
+
+
+def test_split_models_while_searching(tmp_path, make_index):
+    index = make_index([
+        ['F1.S1.DS.CDS01.CMA001_FIT100', 'Endress', 'TMT82'],
+        ['F1.S1.DS.CDS01.CMA001_PIT101', 'Emerson', '3051S'],
+        ['F1.S1.DS.CDS01.CMA001_TIT102', 'Emerson', '3051S'],
+    ])
+    make_bundle(tmp_path, ['TMT82', '3051S'])
+    p_out = tmp_path / 'output'
+    p_out.mkdir()
+
+    # each model is split once, as soon as the pdf has been searched
+    splitter = tools.split.Split('model', tmp_path, p_out, index)
+    tools.search.Search(tmp_path, p_out, index, search_type='model', boundaries=True,
+                        on_searched=splitter.split_source).run()
+    splitter.close()
+
+    assert index.df['Destination'].to_list() == ['ATEX Certificate - TMT82'] + ['ATEX Certificate - 3051S'] * 2
+    assert sorted(path.name for path in p_out.glob('*.pdf')) == ['ATEX Certificate - 3051S.pdf',
+                                                                 'ATEX Certificate - TMT82.pdf']
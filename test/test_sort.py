@@ -0,0 +1,17 @@
+import constants
+import tools.sort
+
+
+def test_groups_blank_model(tmp_path, make_index):
+    index = make_index([
+        ['F1.S1.DS.CDS01.CMA001_FIT100', 'Endress', 'TMT82'],
+        ['F1.S1.DS.CDS01.CMA001_LIT103', None, None],
+        ['F1.S1.DS.CDS01.CMA001_PIT101', 'Endress', 'TMT82'],
+    ])
+    index.df['Destination'] = ['FIT100', 'LIT103', 'PIT101']
+
+    for order in ['model', 'supplier']:
+        sort = tools.sort.Sort(tmp_path, tmp_path / constants.binder_folder, index, order)
+        groups = {name: rows['Tag No'].to_list() for name, rows in sort._get_groups()}
+        assert groups[f"{constants.binder_name} - {constants.binder_unknown}"] == ['F1.S1.DS.CDS01.CMA001_LIT103']
+        assert sum(len(tags) for tags in groups.values()) == 3
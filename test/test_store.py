@@ -0,0 +1,52 @@
+import pathlib
+
+import constants
+import handlers.pdf
+import handlers.store
+
+p_fixture = pathlib.Path(__file__).parent / 'Calibration Certificate - F1_S1_DS_CDS01_EGC001_FIT209.pdf'
+
+
+def test_load_missing_model(tmp_path, make_index):
+    index = make_index([
+        ['F1.S1.DS.CDS01.CMA001_FIT100', 'Endress', 'TMT82'],
+        ['F1.S1.DS.CDS01.CMA001_PIT101', 'Endress', None],
+    ])
+
+    store = handlers.store.RunStore(tmp_path / 'Run Store.sqlite', {})
+    assert store.load(index, []) == set()
+
+    rows = store.connection.execute("SELECT item, model FROM items ORDER BY item").fetchall()
+    assert rows == [(0, 'TMT82'), (1, None)]
+    store.close()
+
+    # resuming reads the items back without a model
+    store = handlers.store.RunStore(tmp_path / 'Run Store.sqlite', {})
+    assert store.load(index, []) == set()
+    store.close()
+
+
+def test_resume_source(tmp_path, make_index):
+    index = make_index([
+        ['F1.S1.DS.CDS01.EGC001_FIT209', 'Siemens', 'MAG5000'],
+        ['F1.S1.DS.CDS01.EGC001_FIT210', 'Siemens', 'MAG5000'],
+    ])
+    pdf = handlers.pdf.PdfHandler(p_fixture)
+
+    store = handlers.store.RunStore(tmp_path / 'Run Store.sqlite', {})
+    store.load(index, [pdf])
+    index.df.loc[0, ['First Page', 'Last Page', 'Source']] = [0, 2, pdf]
+    store.save_source(pdf, index.get_by_source(pdf, sort=False))
+    store.close()
+
+    # items found in the searched pdf are restored from the source index
+    index = make_index([
+        ['F1.S1.DS.CDS01.EGC001_FIT209', 'Siemens', 'MAG5000'],
+        ['F1.S1.DS.CDS01.EGC001_FIT210', 'Siemens', 'MAG5000'],
+    ])
+    store = handlers.store.RunStore(tmp_path / 'Run Store.sqlite', {})
+    assert store.load(index, [pdf]) == {pdf.name}
+    assert store.get_by_source(pdf.name).index.to_list() == [0]
+    assert index.df.loc[0, 'Source'] is pdf
+    assert index.df.loc[1, 'Source'] == constants.empty
+    store.close()
@@ -1,24 +1,177 @@
 import logging
 
+import constants
 import handlers.instrument_index
+import handlers.report
+import handlers.store
+import handlers.work_queue
 # local imports
 import tools.annotate
+import tools.memtrace
+import tools.progress
 import tools.search
+import tools.shard
+import tools.sort
 import tools.split
 
 
-def search_and_split(p_in, p_out, stype, supplier=False):
+def get_region(p_index, supplier=False):
+    # match configured extraction regions against the index name and supplier
+    for pattern, region in constants.extraction_regions.items():
+        if pattern in p_index.stem or pattern == supplier:
+            logging.info(f"Using extraction region {region} configured for {pattern}.")
+            return region
+
+    return None
+
+
+def search_and_split(p_in, p_out, stype, supplier=False, output_mode='files', region=None, boundaries=False,
+                     deduplicate=True, memtrace=False, cache=False, extractor='pypdf', discover=False, progress=None,
+                     store=False, n_writers=constants.split_writers, max_in_flight=constants.split_in_flight,
+                     deduplicate_pages=False):
+    report = handlers.report.RunReport()
+    trace = tools.memtrace.MemoryTrace(memtrace)
+
     # import instrument index
     p_index = sorted(p_in.glob('*.xlsx'))[0]
-    index = handlers.instrument_index.InstrumentIndex(p_index, supplier)
+    with trace.stage('Index Load'):
+        index = handlers.instrument_index.InstrumentIndex(p_index, supplier)
+
+    # fall back to the configured extraction region
+    if region is None:
+        region = get_region(p_index, supplier)
+
+    # commit results as the run progresses, resuming an interrupted run with the same options
+    run_store = None
+    if store:
+        options = {'index': p_index.name, 'index_modified': p_index.stat().st_mtime, 'stype': stype,
+                   'supplier': supplier, 'output_mode': output_mode, 'region': region, 'boundaries': boundaries,
+                   'deduplicate': deduplicate, 'deduplicate_pages': deduplicate_pages, 'extractor': extractor,
+                   'discover': discover}
+        run_store = handlers.store.RunStore(p_out / f"{constants.run_store}.sqlite", options,
+                                            reset_destinations=output_mode in constants.archive_types)
+
+    # with certificate boundaries, each pdf is split as soon as it has been searched
+    splitter = split.Split(stype, p_in, p_out, index, output_mode, progress, run_store, n_writers, max_in_flight)
+    on_searched = splitter.split_source if boundaries else None
+
+    try:
+        # search pdfs
+        with trace.stage('Search'):
+            search.Search(p_in, p_out, index, search_type=stype, report=report, region=region,
+                          boundaries=boundaries, on_searched=on_searched, deduplicate=deduplicate, cache=cache,
+                          extractor=extractor, discover=discover, progress=progress, store=run_store,
+                          deduplicate_pages=deduplicate_pages).run()
 
-    # search pdfs
-    search_index = search.Search(p_in, p_out, index, search_type=stype).run()
+        # split remaining pdfs
+        with trace.stage('Split'):
+            split_index = splitter.run()
 
-    # split pdfs
-    split_index = split.Split(stype, p_in, p_out, search_index).run()
+    # a failed search still closes an archive split into while searching
+    finally:
+        splitter.close()
+        if run_store is not None:
+            run_store.close()
 
     # dump index to file
-    p_dump = p_out / f"Search and Split Output.xlsx"
-    split_index.dump(p_dump)
+    p_dump = p_out / f"{constants.search_and_split_output}.xlsx"
+    with trace.stage('Dump'):
+        split_index.dump(p_dump)
+
+    trace.add_to_report(report)
+    report.dump(p_out / f"Run Report.xlsx")
     logging.info(f"Search and split complete!")
+
+
+def search_and_split_sharded(step, p_in, p_out, stype, supplier=False, output_mode='files', region=None,
+                             boundaries=False, deduplicate=True, p_queue=None, n_workers=1, memtrace=False,
+                             extractor='pypdf', discover=False, progress=None, n_writers=constants.split_writers,
+                             max_in_flight=constants.split_in_flight, deduplicate_pages=False):
+    # queue is shared between hosts when placed on a shared drive
+    if p_queue is None:
+        p_queue = p_out / constants.work_queue
+    p_index = sorted(p_in.glob('*.xlsx'))[0]
+
+    # shard input pdfs into work units
+    if step == 'enqueue':
+        if region is None:
+            region = get_region(p_index, supplier)
+        options = {'stype': stype, 'supplier': supplier, 'region': region, 'boundaries': boundaries,
+                   'deduplicate': deduplicate, 'deduplicate_pages': deduplicate_pages, 'extractor': extractor,
+                   'discover': discover}
+        shard.enqueue(p_in, p_queue, options)
+
+    # search units until the queue is empty
+    elif step == 'work':
+        n_units = shard.run_workers(p_in, p_queue, n_workers)
+        logging.info(f"Completed {n_units} units.")
+
+    # reduce unit results and split
+    elif step == 'merge':
+        report = handlers.report.RunReport()
+        trace = tools.memtrace.MemoryTrace(memtrace)
+
+        options = handlers.work_queue.WorkQueue(p_queue).options
+        if options is None:
+            logging.error(f"No work queue found in {p_queue}, nothing to merge.")
+            return
+
+        with trace.stage('Index Load'):
+            index = handlers.instrument_index.InstrumentIndex(p_index, options['supplier'])
+
+        with trace.stage('Merge'):
+            if not shard.merge(p_in, p_out, p_queue, index, report):
+                return
+
+        with trace.stage('Split'):
+            split_index = split.Split(options['stype'], p_in, p_out, index, output_mode, progress,
+                                      n_writers=n_writers, max_in_flight=max_in_flight).run()
+
+        p_dump = p_out / f"{constants.search_and_split_output}.xlsx"
+        with trace.stage('Dump'):
+            split_index.dump(p_dump)
+
+        trace.add_to_report(report)
+        report.dump(p_out / f"Run Report.xlsx")
+        logging.info(f"Search and split complete!")
+
+    else:
+        logging.error(f"Shard step {step} not recognized.")
+
+
+def annotate_split(p_out, atypes, stamp=False, n_workers=1, memtrace=False, progress=None):
+    report = handlers.report.RunReport()
+    trace = tools.memtrace.MemoryTrace(memtrace)
+
+    # import search and split output
+    p_dump = p_out / f"{constants.search_and_split_output}.xlsx"
+    with trace.stage('Index Load'):
+        index = handlers.instrument_index.InstrumentIndex(p_dump, dumped=True)
+
+    # annotate split pdfs with the items pointing to them
+    with trace.stage('Annotate'):
+        annotate.Annotate(p_out, p_out / constants.annotate_folder, index, list(atypes), stamp, n_workers,
+                          progress).run()
+
+    trace.add_to_report(report)
+    report.dump(p_out / f"Annotate Report.xlsx")
+    logging.info(f"Annotate complete!")
+
+
+def sort_binders(p_out, order='tag', max_pages=constants.binder_max_pages, memtrace=False, progress=None):
+    report = handlers.report.RunReport()
+    trace = tools.memtrace.MemoryTrace(memtrace)
+
+    # import search and split output
+    p_dump = p_out / f"{constants.search_and_split_output}.xlsx"
+    with trace.stage('Index Load'):
+        index = handlers.instrument_index.InstrumentIndex(p_dump, dumped=True)
+
+    # merge split pdfs into binders
+    with trace.stage('Sort'):
+        sort.Sort(p_out, p_out / constants.binder_folder, index, order, max_pages,
+                  progress).run()
+
+    trace.add_to_report(report)
+    report.dump(p_out / f"Sort Report.xlsx")
+    logging.info(f"Sort complete!")
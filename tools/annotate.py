@@ -1,48 +1,123 @@
 import logging
+import multiprocessing
 import pathlib
 
-import constants
 import handlers.instrument_index
 import handlers.pdf
 import tools.base
 
 
 class Annotate(tools.base.PdfTool):
-    def __init__(self, input_path: pathlib.Path, output_path: pathlib.Path, index: handlers.instrument_index.InstrumentIndex, annotate_type: str) -> None:
+    def __init__(self, input_path: pathlib.Path, output_path: pathlib.Path, index: handlers.instrument_index.InstrumentIndex, annotate_types: list[str], stamp: bool = False, n_workers: int = 1, progress=None) -> None:
+        """
+        PDF Annotate tool, subclass of PdfTool. Annotates split PDFs with the items pointing to them.
+        :param input_path: The folder holding the split PDFs.
+        :param output_path: The folder to write annotated PDFs to.
+        :param index: The Search and Split Output index pointing to the split PDFs.
+        :param annotate_types: The item types to annotate onto the first page, tag and/or model.
+        :param stamp: Whether to stamp every page with the PDF name and page number.
+        :param n_workers: The number of processes annotating PDFs in parallel.
+        :param progress: The progress events to report to.
+        """
         self.index = index
-        self.type = annotate_type
-        super().__init__(input_path, output_path)
+        self.types = annotate_types
+        self.stamp = stamp
+        self.n_workers = n_workers
+        super().__init__(input_path, output_path, progress)
 
-    def run(self) -> None:
-        # get list of pdfs to annotate
-        ls_pdf = self._get_ls_pdf()
+    def run(self) -> int:
+        """
+        Annotates each PDF in a single rewrite.
+        :return: The number of PDFs annotated.
+        """
+        self.start_timer()
+        self.output_folder.mkdir(parents=True, exist_ok=True)
 
-        for pdf in ls_pdf:
-            # get annotation text for the pdf
-            annotation = self._get_annotation(pdf)
+        # collect the annotations of each pdf, pdfs are reopened by the worker processes
+        jobs = []
+        for pdf in self._get_ls_pdf():
+            annotations = self._get_annotations(pdf)
+            if annotations or self.stamp:
+                jobs.append((pdf.source, self.output_folder / pdf.source.name, annotations, self.stamp))
+            else:
+                logging.warning(f"No items point to {pdf.name}, skipping annotation...")
 
-            # annotate the pdf with all tags that point to it
-            self._annotate(pdf, annotation)
+        n_annotated = 0
+        self.progress.start('Annotate', len(jobs))
+        for annotated, n_pages, n_bytes in self._run_jobs(jobs):
+            n_annotated += annotated
+
+            # report progress
+            self.progress.advance(n_pages=n_pages, n_bytes=n_bytes)
+        self.progress.finish()
+
+        logging.info(f"Done annotating {n_annotated} of {len(jobs)} PDFs.")
+        return n_annotated
+
+    def _run_jobs(self, jobs: list[tuple]):
+        """
+        Annotates the PDFs of the jobs, in this process when there is a single worker.
+        :param jobs: The source, output path, annotations and stamp of each PDF.
+        :return: Whether each PDF was annotated, its number of pages and bytes written, in order.
+        """
+        if self.n_workers == 1:
+            yield from map(_annotate_job, jobs)
+            return
+
+        with multiprocessing.Pool(self.n_workers) as pool:
+            yield from pool.imap(_annotate_job, jobs)
 
     def _get_ls_pdf(self):
         return handlers.pdf.get_pdfs(self.input_folder)
 
-    def _get_annotation(self, pdf) -> list[str]:
+    def _get_annotations(self, pdf: handlers.pdf.PdfHandler) -> list[tuple]:
+        """
+        Gets the annotations for the items which point to the PDF.
+        :param pdf: The split PDF.
+        :return: The page number, annotation format and lines of each annotation.
+        """
         # extract all items which point to the pdf
         rows = self.index.get_by_destination(pdf.name)
+        if rows.empty:
+            return []
+
+        annotations = []
+        for annotate_type in self.types:
+            if annotate_type == 'tag':
+                annotations.append((0, handlers.pdf.TagsAnnotation, rows['Tag No'].to_list()))
+            elif annotate_type == 'model':
+                models = rows['Model'].dropna().unique()
+                annotations.append((0, handlers.pdf.ModelsAnnotation, [str(model) for model in models]))
+            else:
+                logging.error(f"Annotate type {annotate_type} not recognized. Skipping annotation...")
+
+        return annotations
+
+
+def annotate_pdf(source: pathlib.Path, path: pathlib.Path, annotations: list[tuple], stamp: bool = False) -> tuple[bool, int]:
+    """
+    Annotates a PDF in a single rewrite.
+    :param source: The PDF to annotate.
+    :param path: The path to write the annotated PDF to.
+    :param annotations: The page number, annotation format and lines of each annotation.
+    :param stamp: Whether to stamp every page with the PDF name and page number.
+    :return: Whether the annotated PDF was written, and its number of pages.
+    """
+    pdf = handlers.pdf.PdfHandler(source)
+    batch = handlers.pdf.AnnotationBatch(pdf)
+    for page_number, annotation_type, lines in annotations:
+        batch.add(page_number, annotation_type, lines)
 
-        if self.type == 'tag':
-            # get list of tags to annotate onto pdf
-            return rows['Tag No'].to_list()
+    if stamp:
+        for page_number in range(pdf.number_of_pages):
+            batch.add(page_number, handlers.pdf.StampAnnotation,
+                      [f"{pdf.name} - Page {page_number + 1} of {pdf.number_of_pages}"])
 
-        else:
-            logging.error(f"Annotate type {self.type} not recognized. Skipping annotation...")
-            return [constants.error]
+    return batch.write(path), pdf.number_of_pages
 
-    def _annotate(self, pdf, annotation):
-        if self.type == 'tag':
-            return pdf.annotate_tags(0, annotation, pdf)
 
-        else:
-            logging.error(f"Annotate type {self.type} not recognized. Skipping annotation...")
-            return [constants.error]
+def _annotate_job(job):
+    # pages and bytes written are returned for progress events
+    annotated, n_pages = annotate_pdf(*job)
+    path = job[1]
+    return annotated, n_pages, path.stat().st_size if annotated else 0
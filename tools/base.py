@@ -1,12 +1,16 @@
 import datetime
-import logging
 import time
 
+import tools.progress
+
 
 class PdfTool:
-    def __init__(self, input_path, output_path):
+    def __init__(self, input_path, output_path, progress=None):
         self.start_time = None
 
+        # progress events, logged only unless a callback or file is set
+        self.progress = progress if progress is not None else tools.progress.Progress()
+
         # set I/O folders
         self.input_folder = input_path
         self.output_folder = output_path
@@ -35,14 +39,3 @@ class PdfTool:
         """
         execution_time = self._timestamp() - self.start_time
         return datetime.timedelta(seconds=execution_time)
-
-    def log_execution(self, n_processed: int, n_total: int) -> None:
-        """
-        Logs the completion percentage and estimated time remaining.
-        :param n_processed: The number of processed items.
-        :param n_total: The total number of items to process.
-        """
-        pct_execution = n_processed / n_total * 100.0
-        estimated_time_remaining = self.get_execution_time() * (n_total - n_processed)
-        logging.info(f"{pct_execution}% of items processed, estimated time remaining is {estimated_time_remaining}.")
-
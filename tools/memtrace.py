@@ -0,0 +1,125 @@
+import contextlib
+import logging
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows, peak RSS is not reported
+    resource = None
+
+
+class MemoryTrace:
+    def __init__(self, enabled=False, n_top=10, n_frames=1):
+        """
+        Records allocations and peak memory around each stage of a run.
+        :param enabled: Whether to trace memory, stages are still timed when disabled.
+        :param n_top: The number of top allocation sites to record per stage.
+        :param n_frames: The number of stack frames to keep per allocation.
+        """
+        self.enabled = enabled
+        self.n_top = n_top
+        self.n_frames = n_frames
+
+        # records for each stage
+        self.stages = []
+        self.allocations = []
+
+    @staticmethod
+    def _reset_peak_rss():
+        # linux allows resetting the peak rss of the process, elsewhere peak rss is the process lifetime peak
+        try:
+            with open('/proc/self/clear_refs', 'w') as clear_refs:
+                clear_refs.write('5')
+        except OSError:
+            pass
+
+    @staticmethod
+    def _get_peak_rss():
+        # linux reports the peak rss since the last reset in kilobytes
+        try:
+            with open('/proc/self/status') as status:
+                for line in status:
+                    if line.startswith('VmHWM:'):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            pass
+
+        if resource is None:
+            return None
+
+        # ru_maxrss is the process lifetime peak
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        Traces memory while the stage runs.
+        :param name: The stage name.
+        """
+        if not self.enabled:
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                self.stages.append({'Stage': name, 'Time (s)': round(time.perf_counter() - start, 3)})
+            return
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.n_frames)
+
+        # start stage from a clean peak
+        self._reset_peak_rss()
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            execution_time = time.perf_counter() - start
+            current, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            self._record(name, execution_time, current, peak, before, after)
+
+    def _record(self, name, execution_time, current, peak, before, after):
+        # ignore allocations made by tracing itself
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        statistics = after.filter_traces(filters).compare_to(before.filter_traces(filters), 'lineno')
+
+        peak_rss = self._get_peak_rss()
+        self.stages.append({
+            'Stage': name,
+            'Time (s)': round(execution_time, 3),
+            'Traced Peak (MB)': round(peak / 2 ** 20, 3),
+            'Traced At End (MB)': round(current / 2 ** 20, 3),
+            'Peak RSS (MB)': round(peak_rss, 1) if peak_rss is not None else None
+        })
+        logging.info(f"{name}: traced peak {peak / 2 ** 20:.1f} MB, peak RSS {peak_rss} MB")
+
+        for rank, statistic in enumerate(statistics[:self.n_top], start=1):
+            frame = statistic.traceback[0]
+            self.allocations.append({
+                'Stage': name,
+                'Rank': rank,
+                'Site': f"{frame.filename}:{frame.lineno}",
+                'Size (MB)': round(statistic.size / 2 ** 20, 3),
+                'Size Change (MB)': round(statistic.size_diff / 2 ** 20, 3),
+                'Blocks': statistic.count
+            })
+
+    def add_to_report(self, report):
+        """
+        Adds the stage records and top allocation sites to the run report.
+        :param report: The run report.
+        """
+        if not self.enabled:
+            return
+
+        for record in self.stages:
+            report.add('Memory', record)
+        for record in self.allocations:
+            report.add('Memory Allocations', record)
+
+        tracemalloc.stop()
@@ -0,0 +1,110 @@
+import collections
+import datetime
+import json
+import logging
+import time
+
+import constants
+
+
+class Progress:
+    def __init__(self, callback=None, path=None, interval=constants.progress_interval, window=constants.progress_window):
+        """
+        Emits progress events for each stage of a run, throttled so updates are cheap enough to make per page.
+        :param callback: Called with each event.
+        :param path: A JSON lines file to append each event to.
+        :param interval: The minimum seconds between events, the first and last event of a stage are always emitted.
+        :param window: The seconds of recent progress the rates and estimated time remaining are measured over.
+        """
+        self.callback = callback
+        self.path = path
+        self.interval = interval
+        self.window = window
+
+        self.stage = None
+        self._reset(0)
+
+    def _reset(self, n_total):
+        self.n_total = n_total
+        self.n_done = 0
+        self.n_pages = 0
+        self.n_bytes = 0
+        self.start_time = time.monotonic()
+        self._last_emit = self.start_time
+
+        # (time, items, pages) at each event within the window
+        self._samples = collections.deque([(self.start_time, 0, 0)])
+
+    def start(self, stage, n_total):
+        """
+        Starts a stage.
+        :param stage: The stage name.
+        :param n_total: The number of items in the stage.
+        """
+        self.stage = stage
+        self._reset(n_total)
+        self._emit('start', self.start_time)
+
+    def advance(self, n_items=1, n_pages=0, n_bytes=0):
+        """
+        Records processed items, pages and bytes written.
+        :param n_items: The number of items processed.
+        :param n_pages: The number of pages processed.
+        :param n_bytes: The number of bytes written.
+        """
+        self.n_done += n_items
+        self.n_pages += n_pages
+        self.n_bytes += n_bytes
+
+        now = time.monotonic()
+        if now - self._last_emit >= self.interval:
+            self._emit('progress', now)
+
+    def finish(self):
+        self._emit('finish', time.monotonic())
+
+    def _emit(self, event, now):
+        self._last_emit = now
+
+        # rates over the recent window, so the estimate follows the current pace
+        self._samples.append((now, self.n_done, self.n_pages))
+        while len(self._samples) > 2 and now - self._samples[1][0] >= self.window:
+            self._samples.popleft()
+        start, items_start, pages_start = self._samples[0]
+        elapsed = now - start
+
+        items_per_second = (self.n_done - items_start) / elapsed if elapsed > 0 else None
+        remaining = self.n_total - self.n_done
+        if remaining <= 0:
+            eta = 0.0
+        elif items_per_second:
+            eta = remaining / items_per_second
+        else:
+            eta = None
+
+        record = {
+            'event': event,
+            'stage': self.stage,
+            'time': datetime.datetime.now().isoformat(timespec='seconds'),
+            'elapsed': round(now - self.start_time, 3),
+            'done': self.n_done,
+            'total': self.n_total,
+            'pages': self.n_pages,
+            'pages_per_second': round((self.n_pages - pages_start) / elapsed, 2) if elapsed > 0 else None,
+            'bytes': self.n_bytes,
+            'eta': round(eta, 1) if eta is not None else None
+        }
+
+        pct_execution = self.n_done / self.n_total * 100.0 if self.n_total else 100.0
+        eta_text = datetime.timedelta(seconds=round(eta)) if eta is not None else "unknown"
+        logging.info(f"{self.stage}: {pct_execution:.1f}% of items processed, estimated time remaining is {eta_text}.")
+
+        if self.callback is not None:
+            self.callback(record)
+
+        if self.path is not None:
+            try:
+                with open(self.path, 'a') as file:
+                    file.write(json.dumps(record) + '\n')
+            except OSError as error:
+                logging.error(f"{error}. Unable to write progress to {self.path}.")
@@ -1,36 +1,95 @@
+import collections
 import logging
 
 import numpy
 import pandas
 
 import constants
+import handlers.cache
+import handlers.extractor
 import handlers.instrument_index
+import handlers.normalise
 import handlers.pdf
+import handlers.record
+import handlers.report
 import tools.base
 
 
 class Search(tools.base.PdfTool):
-    def __init__(self, input_path, output_path, instrument_index, search_type):
+    def __init__(self, input_path, output_path, instrument_index, search_type, report=None, region=None,
+                 boundaries=False, on_searched=None, deduplicate=False, cache=False,
+                 names=None, extractor='pypdf', discover=False, progress=None, store=None, deduplicate_pages=False):
         """
         PDF Search tool, subclass of PdfTool.
         :param input_path: The input name to search in for PDFs.
         :param output_path: The output name to write to.
         :param instrument_index: The Instrument Index to pull search items from.
         :param search_type: The type of item to search for.
+        :param report: The run report to add search statistics to.
+        :param region: The fraction of the page height from the top to search in, None searches whole pages.
+        :param boundaries: Whether to take page ranges from detected certificate boundaries.
+        :param on_searched: Called with each PDF once its items have page ranges, requires boundaries.
+        :param deduplicate: Whether to skip duplicate PDFs.
+        :param cache: Whether to reuse search results from earlier runs on unchanged PDFs.
+        :param names: The file names of the PDFs to search, None searches all PDFs in the input folder.
+        :param extractor: The text extraction backend, falls back to pypdf if not installed.
+        :param discover: Whether to find tags by scanning each page once for tag-like tokens, instead of searching each tag.
+        :param progress: The progress events to report to.
+        :param store: The run store to commit results to after each PDF, PDFs it has committed are not searched again.
+        :param deduplicate_pages: Whether to skip pages with the same content and resources as an earlier page.
         """
         self.index = instrument_index
         self.type = search_type
-        super().__init__(input_path, output_path)
+        self.region = region
+        self.boundaries = boundaries
+        self.on_searched = on_searched
+        self.deduplicate = deduplicate
+        self.deduplicate_pages = deduplicate_pages
+        self.names = names
+        self.store = store
+        self.records = []
+        self.extractor = handlers.extractor.get_extractor(extractor)
+        self.report = report if report is not None else handlers.report.RunReport()
+        super().__init__(input_path, output_path, progress)
+
+        # results depend on the extraction settings, so a changed region or backend starts a new cache
+        self.cache = None
+        if cache:
+            self.cache = handlers.cache.SearchCache(self.output_folder / f"{constants.search_cache}.json",
+                                                    options=f"region={self.region},extractor={self.extractor.name},"
+                                                            f"text={handlers.normalise.form}")
+
+        # set search strings for the search type
+        self.index._set_search(self.type)
+
+        # canonical search strings of all items, found or not, so found items are not reported as unindexed
+        self.keys = None
+        if discover and self.type != 'tag':
+            logging.warning(f"Discovery only applies to tag search, searching for each {self.type} instead.")
+        elif discover:
+            self.keys = {handlers.normalise.normalise(text)
+                         for ls_search in self.index.get_tags(return_if_found=True)['Search']
+                         for text in ls_search if text != constants.not_applicable}
 
         # get list of files to process
         self.ls_pdf = self._get_ls_pdf()
 
+        # resume an interrupted run from the last committed pdf
+        if self.store is not None:
+            searched = self.store.load(self.index, self.ls_pdf)
+            self.ls_pdf = [pdf for pdf in self.ls_pdf if pdf.name not in searched]
+
     def run(self) -> handlers.instrument_index.InstrumentIndex:
         """
         Searches through all PDFs for items and saves the PDF they are found in and the page range in the search index.
         :return: The search index with the page range and source file where the search item was found.
         """
         self.start_timer()
+        self.progress.start('Search', len(self.ls_pdf))
+
+        # records of the tags not found yet, searched instead of the index rows
+        if self.type == 'tag':
+            self.records = self.index.get_records()
 
         # process pdfs
         for idx, pdf in enumerate(self.ls_pdf):
@@ -38,12 +97,33 @@ class Search(tools.base.PdfTool):
             self._search(pdf)
             logging.info(f"Done searching in {pdf.name}!")
 
-            # log execution stats
-            self.log_execution(n_processed=idx + 1, n_total=len(self.ls_pdf))
+            # report pages skipped for having no text layer
+            self._report_image_pages(pdf)
 
-        # get list of items to assign page ranges
-        no_page_range_rows = self.index.get_no_page_range()
-        self._set_page_range(no_page_range_rows)
+            # page ranges are known as soon as the pdf has been searched
+            if self.boundaries:
+                self._set_boundary_ranges(pdf)
+                if self.on_searched is not None:
+                    self.on_searched(pdf)
+
+            # keep memory bounded by the largest pdf rather than all pdfs
+            pdf.release_text()
+
+            # commit the pdf, so an interrupted run resumes after it
+            if self.store is not None:
+                self.store.save_source(pdf, self.index.get_by_source(pdf, sort=False))
+
+            # report progress
+            self.progress.advance(n_pages=pdf.number_of_pages)
+
+        self.set_page_ranges()
+        if self.store is not None:
+            self.store.save_items(self.index.get_found())
+
+        if self.cache is not None:
+            self._save_cache()
+
+        self.progress.finish()
 
         logging.info(f"Done searching all PDFs.")
         return self.index
@@ -53,7 +133,56 @@ class Search(tools.base.PdfTool):
         Gets a list of PDFs to process from the input name.
         :return: A list of PDF handlers.
         """
-        return handlers.pdf.get_pdfs(self.input_folder)
+        return handlers.pdf.get_pdfs(self.input_folder, self.region, self.deduplicate, self.report, self.cache,
+                                     self.names, self.extractor, self.deduplicate_pages)
+
+    def set_page_ranges(self) -> None:
+        """
+        Sets the page range of all items which have been found but not assigned a page range.
+        """
+        if self.type == 'tag':
+            self._set_tag_page_ranges()
+            return
+
+        # get list of items to assign page ranges
+        no_page_range_rows = self.index.get_no_page_range()
+        for idx, row in no_page_range_rows.iterrows():
+            self._set_page_range(row)
+
+    def _save_cache(self) -> None:
+        """
+        Saves the search results for the next run and reports how many searches were reused.
+        """
+        self.output_folder.mkdir(parents=True, exist_ok=True)
+        self.cache.save()
+
+        self.report.add('Search Cache', {
+            'Hits': self.cache.n_hits,
+            'Misses': self.cache.n_misses,
+            'PDFs': len(self.ls_pdf),
+            'PDFs Opened': sum(pdf.is_open for pdf in self.ls_pdf)
+        })
+
+    def _report_image_pages(self, pdf: handlers.pdf.PdfHandler) -> None:
+        """
+        Reports the pages of the PDF which were skipped for having no text layer.
+        :param pdf: The searched PDF.
+        """
+        # pdfs searched from the cache were never opened
+        if not pdf.is_open:
+            return
+
+        image_pages = pdf.image_pages
+        if not image_pages:
+            return
+
+        logging.warning(f"Skipped {len(image_pages)} of {pdf.number_of_pages} pages without text in {pdf.name}")
+        self.report.add('Image Only Pages', {
+            'Source': pdf.name,
+            'Pages': pdf.number_of_pages,
+            'Image Only Pages': len(image_pages),
+            'Page Numbers': ", ".join(str(page_number) for page_number in image_pages)
+        })
 
     def _search(self, pdf: handlers.pdf.PdfHandler) -> bool:
         """
@@ -61,7 +190,10 @@ class Search(tools.base.PdfTool):
         :param pdf: The PDF to search in.
         :return: Whether the search completed successfully.
         """
-        if self.type == 'tag':
+        if self.type == 'tag' and self.keys is not None:
+            self._discover_tags(pdf)
+            return True
+        elif self.type == 'tag':
             self._search_tags(pdf)
             return True
         elif self.type == 'model':
@@ -77,18 +209,48 @@ class Search(tools.base.PdfTool):
         :param pdf: The PDF to search in.
         :return: Boolean if search was successful.
         """
-        # get tags from instrument index
-        df_tags = self.index.get_tags()
-        df_tags['First Page'] = df_tags.apply(lambda row: pdf.search_list(row['Search']), axis=1)
+        # one pass over the pages for the search strings of all tags not found yet
+        found = pdf.search_all({key for record in self.records for key in record.search})
+        for record in self.records:
+            record.first_page = next((found[key] for key in record.search if found[key] != constants.not_found),
+                                     constants.not_found)
+
+        self._update_found(pdf)
+        return True
+
+    def _discover_tags(self, pdf: handlers.pdf.PdfHandler) -> bool:
+        """
+        Finds Tag numbers by joining the tag-like tokens of each page against the index, and reports unindexed tags.
+        :param pdf: The PDF to search in.
+        :return: Boolean if search was successful.
+        """
+        found, unindexed = pdf.discover(self.keys)
 
-        # save pdf to source if found
-        df_tags.loc[df_tags['First Page'] != constants.not_found, 'Source'] = pdf
+        for token, page_number in unindexed.items():
+            self.report.add('Unindexed Tags', {'Tag': token.upper(), 'Source': pdf.name, 'Page': page_number})
+        if unindexed:
+            logging.warning(f"Found {len(unindexed)} tags in {pdf.name} which are not in the instrument index")
 
-        # update instrument index with the results
-        self.index.update(df_tags)
+        # first search string found, in the same order as a search
+        for record in self.records:
+            record.first_page = next((found[key] for key in record.search if key in found), constants.not_found)
 
+        self._update_found(pdf)
         return True
 
+    def _update_found(self, pdf: handlers.pdf.PdfHandler) -> None:
+        """
+        Saves the PDF to the source of the records found in it and syncs them to the index.
+        :param pdf: The searched PDF.
+        """
+        found = [record for record in self.records if record.found]
+        for record in found:
+            record.source = pdf
+
+        # only found items change, boundaries, split and the store read them from the index after each pdf
+        self.index.update_records(found)
+        self.records = [record for record in self.records if not record.found]
+
     def _search_models(self, pdf: handlers.pdf.PdfHandler) -> bool:
         """
         Searches through the PDF for Model numbers.
@@ -101,8 +263,8 @@ class Search(tools.base.PdfTool):
         # search for each model
         for mdl in ls_models:
             # get all tags associated with the model
-            df_model = self.index.get_by_model(mdl)
-            df_model['First Page'] = pdf.search_list(df_model.at[0, 'Search'])
+            df_model = self.index.get_by_model(mdl).copy()
+            df_model['First Page'] = pdf.search_list(df_model['Search'].iloc[0])
             logging.info(f"Finished searching for {mdl} in {pdf.name}")
 
             # save pdf to source if found
@@ -113,27 +275,69 @@ class Search(tools.base.PdfTool):
 
         return True
 
-    def _set_page_range(self, row: pandas.DataFrame) -> bool:
+    def _set_boundary_ranges(self, pdf: handlers.pdf.PdfHandler) -> None:
+        """
+        Sets the page range of all items found in the PDF to the certificate they were found in.
+        :param pdf: The searched PDF.
+        """
+        records = handlers.record.get_records(self.index.get_by_source(pdf, sort=False), search=False)
+        records = [record for record in records if record.last_page == constants.not_found]
+
+        for record in records:
+            record.first_page, record.last_page = pdf.get_page_range(record.first_page)
+
+        self.index.update_records(records)
+
+    def _set_tag_page_ranges(self) -> None:
+        """
+        Sets the page range of all tags which have been found but not assigned a page range, each runs to the next
+        item found in the same PDF.
+        """
+        records = handlers.record.get_records(self.index.get_found(), search=False)
+
+        # first pages of the items in each pdf, sorted once rather than for each item
+        first_pages = collections.defaultdict(list)
+        for record in records:
+            first_pages[record.source].append(record.first_page)
+        first_pages = {source: numpy.sort(pages) for source, pages in first_pages.items()}
+
+        records = [record for record in records if record.found and record.last_page == constants.not_found]
+        for record in records:
+            # the last item runs to the end of the pdf
+            pages = first_pages[record.source]
+            idx_adjacent = numpy.searchsorted(pages, record.first_page, side='right')
+            if idx_adjacent < len(pages):
+                record.last_page = int(pages[idx_adjacent])
+            else:
+                record.last_page = record.source.number_of_pages
+
+        self.index.update_records(records)
+
+    def _set_page_range(self, row: pandas.Series) -> bool:
         """
         Set the page range of the row.
         :param row: The row to set the page range for.
         :return: Whether the page range was set successfully.
         """
-        # get rows with common source
+        # get first pages of rows with common source
         sorted_rows = self.index.get_by_source(row['Source'], sort=True)
+        first_pages = sorted_rows['First Page'].to_numpy()
 
-        # sort search for row with higher page number
-        idx_adjacent = numpy.searchsorted(sorted_rows['First Page'], row['First Page'], side='right')
+        # sort search for row with higher page number, the last item runs to the end of the pdf
+        idx_adjacent = numpy.searchsorted(first_pages, row['First Page'], side='right')
+        if idx_adjacent < len(first_pages):
+            last_page = first_pages[idx_adjacent]
+        else:
+            last_page = row['Source'].number_of_pages
 
         if self.type == 'tag':
-            row['Last Page'] = sorted_rows.at[idx_adjacent, 'First Page']
-            self.index.update(row)
+            self.index.update(pandas.DataFrame({'Last Page': last_page}, index=[row.name]))
             return True
 
         # apply model page range to all models
         elif self.type == 'model':
-            model_rows = self.index.get_by_model(row['Model'], return_if_found=True)
-            model_rows['Last Page'] = sorted_rows.at[idx_adjacent, 'First Page']
+            model_rows = self.index.get_by_model(row['Model'], return_if_found=True).copy()
+            model_rows['Last Page'] = last_page
             self.index.update(model_rows)
             return True
 
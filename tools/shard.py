@@ -0,0 +1,192 @@
+import copy
+import logging
+import multiprocessing
+import pathlib
+
+import pandas
+
+import constants
+import handlers.instrument_index
+import handlers.pdf
+import handlers.report
+import handlers.work_queue
+import tools.search
+
+
+def get_units(ls_pdf: list[pathlib.Path], max_bytes: int = constants.shard_bytes) -> list[list[str]]:
+    """
+    Shards PDFs into units of consecutive PDFs, so merged results keep the processing order.
+    :param ls_pdf: The PDFs in processing order.
+    :param max_bytes: The size after which a new unit is started, a larger PDF is a unit of its own.
+    :return: The PDF names in each unit.
+    """
+    units = []
+    unit = []
+    unit_bytes = 0
+    for pdf in ls_pdf:
+        size = pdf.stat().st_size
+        if unit and unit_bytes + size > max_bytes:
+            units.append(unit)
+            unit = []
+            unit_bytes = 0
+
+        unit.append(pdf.name)
+        unit_bytes += size
+
+    if unit:
+        units.append(unit)
+    return units
+
+
+def enqueue(p_in: pathlib.Path, p_queue: pathlib.Path, options: dict, max_bytes: int = constants.shard_bytes) -> bool:
+    """
+    Shards the input PDFs into a work queue.
+    :param p_in: The input folder.
+    :param p_queue: The queue directory, shared between all workers.
+    :param options: The search options every worker runs with.
+    :param max_bytes: The size after which a new unit is started.
+    :return: Whether the queue was created.
+    """
+    ls_pdf = sorted(p_in.glob('*.pdf'))
+
+    # duplicates across units are only found here
+    duplicates = {}
+    if options['deduplicate']:
+        digests, duplicates = handlers.pdf.deduplicate_files(ls_pdf)
+        ls_pdf = list(digests)
+    options['duplicates'] = {duplicate.name: original.name for duplicate, original in duplicates.items()}
+
+    units = get_units(ls_pdf, max_bytes)
+    return handlers.work_queue.WorkQueue(p_queue).create(units, options)
+
+
+def work(p_in: pathlib.Path, p_queue: pathlib.Path) -> int:
+    """
+    Searches units from the work queue until none are left.
+    :param p_in: The input folder.
+    :param p_queue: The queue directory.
+    :return: The number of units completed by this worker.
+    """
+    queue = handlers.work_queue.WorkQueue(p_queue)
+    options = queue.options
+    if options is None:
+        logging.error(f"No work queue found in {p_queue}, enqueue before starting workers.")
+        return 0
+
+    # every unit starts from the same index
+    p_index = sorted(p_in.glob('*.xlsx'))[0]
+    index = handlers.instrument_index.InstrumentIndex(p_index, options['supplier'])
+
+    n_units = 0
+    while (unit := queue.claim()) is not None:
+        report = handlers.report.RunReport()
+        unit_index = copy.deepcopy(index)
+
+        # page ranges are recomputed on merge, only pages within a pdf are deduplicated
+        tools.search.Search(p_in, p_queue, unit_index, search_type=options['stype'], report=report,
+                            region=options['region'], boundaries=options['boundaries'],
+                            deduplicate=options['deduplicate'], names=unit['pdfs'],
+                            deduplicate_pages=options.get('deduplicate_pages', False),
+                            extractor=options['extractor'], discover=options['discover']).run()
+
+        unit_index.dump(queue.get_temporary_path(unit), found_only=True)
+        report.dump(queue.get_temporary_path(unit, ' Report'))
+
+        if queue.complete(unit):
+            n_units += 1
+
+    logging.info(f"{queue.worker} completed {n_units} units.")
+    return n_units
+
+
+def run_workers(p_in: pathlib.Path, p_queue: pathlib.Path, n_workers: int) -> int:
+    """
+    Runs workers in local processes.
+    :param p_in: The input folder.
+    :param p_queue: The queue directory.
+    :param n_workers: The number of worker processes.
+    :return: The number of units completed.
+    """
+    if n_workers == 1:
+        return work(p_in, p_queue)
+
+    with multiprocessing.Pool(n_workers) as pool:
+        return sum(pool.starmap(work, [(p_in, p_queue)] * n_workers))
+
+
+def merge(p_in: pathlib.Path, p_out: pathlib.Path, p_queue: pathlib.Path, index: handlers.instrument_index.InstrumentIndex,
+          report: handlers.report.RunReport) -> bool:
+    """
+    Reduces the results of all units into the index.
+    :param p_in: The input folder.
+    :param p_out: The output folder.
+    :param p_queue: The queue directory.
+    :param index: The index to merge results into.
+    :param report: The run report to merge unit reports into.
+    :return: Whether all units were complete and merged.
+    """
+    queue = handlers.work_queue.WorkQueue(p_queue)
+    options = queue.options
+    if options is None:
+        logging.error(f"No work queue found in {p_queue}, nothing to merge.")
+        return False
+
+    status = queue.get_status()
+    if status['pending'] or status['claimed']:
+        logging.error(f"{status['pending']} units are pending and {status['claimed']} are claimed, "
+                      f"wait for all workers to finish before merging.")
+        return False
+
+    # collect partial results and reports of each unit, and the processing order of their pdfs
+    partials = []
+    order = {}
+    for unit in queue.get_done():
+        for name in unit['pdfs']:
+            order[pathlib.Path(name).stem] = len(order)
+
+        partials.append(pandas.read_excel(queue.get_result_path(unit), sheet_name='Instrument Index', index_col=0))
+        report.add('Work Queue', {
+            'Unit': unit['name'],
+            'Worker': unit['worker'],
+            'PDFs': len(unit['pdfs']),
+            'Items Found': len(partials[-1])
+        })
+
+        p_report = queue.get_result_path(unit, ' Report')
+        if p_report.is_file():
+            for section, df_section in pandas.read_excel(p_report, sheet_name=None).items():
+                for record in df_section.to_dict('records'):
+                    report.add(section, record)
+
+    for duplicate, original in options['duplicates'].items():
+        report.add('Deduplication', {
+            'Source': pathlib.Path(duplicate).stem,
+            'Duplicate Of': pathlib.Path(original).stem,
+            'Skipped Bytes': (p_in / duplicate).stat().st_size,
+            'Skipped Pages': handlers.pdf.PdfHandler(p_in / original).number_of_pages
+        })
+
+    found = pandas.concat(partials) if partials else pandas.DataFrame()
+    if found.empty:
+        logging.warning(f"No items found in any unit.")
+        return True
+
+    # an item found in several units belongs to the first pdf it is in, as in an unsharded search
+    found = found.sort_values(by='Source', key=lambda sources: sources.map(order), kind='stable')
+    found = found.loc[~found.index.duplicated(keep='first')]
+
+    # page ranges end at the next item in the pdf, which may since have been assigned to an earlier pdf
+    if not options['boundaries']:
+        found['Last Page'] = constants.not_found
+
+    sources = {name: handlers.pdf.PdfHandler(p_in / f"{name}.pdf", options['region'])
+               for name in found['Source'].unique()}
+    found['Source'] = found['Source'].map(sources)
+    index.update(found[['First Page', 'Last Page', 'Source']])
+
+    searcher = tools.search.Search(p_in, p_out, index, search_type=options['stype'], report=report,
+                                   region=options['region'], names=[])
+    searcher.set_page_ranges()
+
+    logging.info(f"Merged {len(found)} items found in {len(partials)} units.")
+    return True
@@ -0,0 +1,179 @@
+import io
+import logging
+import pathlib
+import tarfile
+import zipfile
+
+import pandas
+import pypdf
+from slugify import slugify
+
+import constants
+import handlers.instrument_index
+import tools.base
+
+
+class Sort(tools.base.PdfTool):
+    def __init__(self, input_path: pathlib.Path, output_path: pathlib.Path, index: handlers.instrument_index.InstrumentIndex, order: str = 'tag', max_pages: int = constants.binder_max_pages, progress=None) -> None:
+        """
+        PDF Sort tool, subclass of PdfTool. Merges split PDFs into turnover binders.
+        :param input_path: The folder holding the split PDFs or split archive.
+        :param output_path: The folder to write binders to.
+        :param index: The Search and Split Output index pointing to the split PDFs.
+        :param order: Whether to build one binder ordered by tag, or one binder per model or supplier.
+        :param max_pages: The number of pages after which a binder is continued in a new volume, 0 for no limit.
+        :param progress: The progress events to report to.
+        """
+        self.index = index
+        self.order = order
+        self.max_pages = max_pages
+        self.archive = None
+        super().__init__(input_path, output_path, progress)
+
+    def run(self) -> list[pathlib.Path]:
+        """
+        Builds a binder for each group of split PDFs, with an outline bookmark for each tag.
+        :return: The binders written to file.
+        """
+        self.start_timer()
+
+        # split output may be a single archive
+        self.archive = self._open_archive()
+
+        self.output_folder.mkdir(parents=True, exist_ok=True)
+        groups = self._get_groups()
+
+        binders = []
+        self.progress.start('Sort', len(groups))
+        for name, rows in groups:
+            binders.extend(self._build_binder(name, rows))
+            self.progress.advance()
+        self.progress.finish()
+
+        if self.archive is not None:
+            self.archive.close()
+
+        logging.info(f"Done sorting {len(binders)} binders.")
+        return binders
+
+    def _get_groups(self) -> list[tuple[str, pandas.DataFrame]]:
+        """
+        Groups the split items into binders.
+        :return: The binder name and the items in it, ordered by tag.
+        """
+        # only items which have been split
+        df = self.index.get_tags(return_if_found=True)
+        df = df.loc[df['Destination'].notna() & ~df['Destination'].isin([constants.empty, constants.not_applicable, constants.error])]
+        df = df.sort_values(by='Tag No')
+
+        if self.order == 'tag':
+            return [(constants.binder_name, df)]
+        elif self.order == 'model':
+            column = 'Model'
+        elif self.order == 'supplier':
+            column = 'Supplied By'
+        else:
+            logging.error(f"Sort order {self.order} not recognized. Sorting by tag...")
+            return [(constants.binder_name, df)]
+
+        # items without a model or supplier are kept together in their own binder
+        groups = []
+        for group, rows in df.groupby(column, sort=True, dropna=False):
+            group = constants.binder_unknown if pandas.isna(group) else str(group)
+            groups.append((f"{constants.binder_name} - {slugify(group, separator=' ', lowercase=False)}", rows))
+        return groups
+
+    def _build_binder(self, name: str, rows: pandas.DataFrame) -> list[pathlib.Path]:
+        """
+        Appends split PDFs to a binder one at a time, starting a new volume at the page limit.
+        :param name: The binder name.
+        :param rows: The items in the binder, in binder order.
+        :return: The binder volumes written to file.
+        """
+        volumes = []
+        writer = pypdf.PdfWriter()
+
+        # items sharing a split pdf are bookmarked on the same pages
+        for destination, destination_rows in rows.groupby('Destination', sort=False):
+            reader = self._get_reader(destination)
+            if reader is None:
+                continue
+
+            # continue in a new volume so memory stays bounded
+            if self.max_pages and len(writer.pages) and len(writer.pages) + len(reader.pages) > self.max_pages:
+                volumes.append(self._write_binder(writer, name, len(volumes) + 1))
+                writer = pypdf.PdfWriter()
+
+            # append pages and bookmark each tag on the first page
+            first_page = len(writer.pages)
+            for page in reader.pages:
+                writer.add_page(page)
+            for tag in destination_rows['Tag No']:
+                writer.add_outline_item(tag, first_page)
+            self.progress.advance(0, n_pages=len(reader.pages))
+
+            # release the input before reading the next one
+            del reader
+
+        if len(writer.pages):
+            volumes.append(self._write_binder(writer, name, len(volumes) + 1 if volumes else None))
+
+        return [volume for volume in volumes if volume is not None]
+
+    def _get_reader(self, destination: str) -> pypdf.PdfReader | None:
+        """
+        Opens a split PDF from the split folder or split archive.
+        :param destination: The destination recorded for the split PDF.
+        :return: The PDF reader or None if the split PDF is missing.
+        """
+        # archive members are the destination with its extension
+        if self.archive is not None:
+            member = f'{destination}.pdf'
+            try:
+                if isinstance(self.archive, zipfile.ZipFile):
+                    data = self.archive.read(member)
+                else:
+                    data = self.archive.extractfile(member).read()
+            except KeyError:
+                logging.warning(f"{member} not found in {constants.split_archive}, skipping...")
+                return None
+            return pypdf.PdfReader(io.BytesIO(data))
+
+        path = self.input_folder / f'{destination}.pdf'
+        if not path.is_file():
+            logging.warning(f"{path.name} not found in {self.input_folder}, skipping...")
+            return None
+        return pypdf.PdfReader(path)
+
+    def _open_archive(self):
+        for archive_type in constants.archive_types:
+            path = self.input_folder / f'{constants.split_archive}.{archive_type}'
+            if path.is_file():
+                logging.info(f"Reading split PDFs from {path.name}")
+                return zipfile.ZipFile(path) if archive_type == 'zip' else tarfile.open(path)
+        return None
+
+    def _write_binder(self, writer: pypdf.PdfWriter, name: str, volume: int | None) -> pathlib.Path | None:
+        """
+        Writes a binder or binder volume to file.
+        :param writer: The binder to write.
+        :param name: The binder name.
+        :param volume: The volume number or None if the binder has a single volume.
+        :return: The path written to or None if writing failed.
+        """
+        if volume is not None:
+            name = f"{name} - Vol {volume:02d}"
+        path = self.output_folder / f'{name}.pdf'
+
+        # write file to disk
+        try:
+            with open(path, 'wb') as output:
+                writer.write(output)
+            logging.info(f"Wrote {path.name} with {len(writer.pages)} pages to {path.parent}!")
+            self.progress.advance(0, n_bytes=path.stat().st_size)
+            return path
+
+        # if an error occurs, return None
+        except OSError as error:
+            logging.error(f"{error}. Unable to write {path.name} to file.")
+            return None
@@ -4,30 +4,51 @@
 # Description: Parses the Excel doc for a list of tags to search for in the PDF doc.
 # It will then extract the relevant pages from the PDF doc and rename them according
 # to their tag.
+import collections
 import logging
 import pathlib
 
-import pandas
-
 import constants
+import handlers.archive
 import handlers.model
+import handlers.pdf
+import handlers.record
 import handlers.tag
 import handlers.instrument_index
+import handlers.writer
 import tools.base
 
 
 class Split(tools.base.PdfTool):
-    def __init__(self, split_type: str, input_path: pathlib.Path, output_path: pathlib.Path, index: handlers.instrument_index.InstrumentIndex) -> None:
+    def __init__(self, split_type: str, input_path: pathlib.Path, output_path: pathlib.Path, index: handlers.instrument_index.InstrumentIndex, output_mode: str = 'files', progress=None, store=None, n_writers: int = constants.split_writers, max_in_flight: int = constants.split_in_flight) -> None:
         """
         PDF Split tool, subclass of PdfTool.
         :param split_type: The type of items to split on.
         :param input_path: The input name to read from.
         :param output_path: The output name to write to.
         :param index: The Search Index to split by.
+        :param output_mode: Whether to write separate files or stream into a single zip or tar archive.
+        :param progress: The progress events to report to.
+        :param store: The run store to commit destinations to.
+        :param n_writers: The number of split files written at once.
+        :param max_in_flight: The bytes of split files waiting to be written, above which splitting waits.
         """
         self.index = index
         self.type = split_type
-        super().__init__(input_path, output_path)
+        self.output_mode = output_mode
+        self.archive = None
+        self.store = store
+
+        # split files are written in the background, destinations are committed once their file is written
+        self.n_writers = n_writers
+        self.max_in_flight = max_in_flight
+        self.writer = None
+        self._writes = collections.deque()
+        self._failed = []
+
+        # bytes written by splits, for progress events
+        self.bytes_written = 0
+        super().__init__(input_path, output_path, progress)
 
     def run(self) -> handlers.instrument_index.InstrumentIndex:
         """
@@ -37,85 +58,256 @@ class Split(tools.base.PdfTool):
         # start the timer
         self.start_timer()
 
-        # split based on split type
+        # open archive if splitting into a single file
+        if self.archive is None:
+            self.archive = self._open_archive()
+        if self.writer is None:
+            self.writer = self._open_writer()
+
+        # a failed split still closes the archive, so it is readable up to the last member
+        try:
+            self._split_all()
+        finally:
+            self.close()
+
+        self.progress.finish()
+        logging.info(f"Done splitting PDFs.")
+        return self.index
+
+    def close(self) -> None:
+        """
+        Writes the manifest and closes the split archive, and waits for split files to be written.
+        """
+        if self.archive is not None:
+            self.archive.close()
+            self.archive = None
+
+        if self.writer is not None:
+            self._close_writer()
+
+        if self.store is not None:
+            self.store.flush()
+
+    def _split_all(self) -> None:
+        """
+        Splits all items in the index which have not been split yet.
+        """
         if self.type == 'tag':
-            tags = self.index.get_tags(return_if_found=True)
-            for idx, row in tags.iterrows():
+            records = self.index.get_records(return_if_found=True, search=False)
+            self.progress.start('Split', len(records))
+            for record in records:
+                # skip items already split while searching
+                if record.destination != constants.empty:
+                    self.progress.advance()
+                    continue
+
                 # split file
-                file_name = self._split_pdf(row)
+                bytes_written = self.bytes_written
+                record.destination = self._split_pdf(record)
 
-                # save destination
-                row['Destination'] = file_name
+                # report progress
+                self.progress.advance(n_pages=self._get_n_pages(record), n_bytes=self.bytes_written - bytes_written)
 
-                # log execution stats
-                self.log_execution(n_processed=idx + 1, n_total=self.index.length)
+            # update index
+            self.index.update_records(records)
 
         elif self.type == 'model':
             # get list of unique models
             ls_models = self.index.get_models(return_if_found=True)
+            self.progress.start('Split', len(ls_models))
 
-            for idx, mdl in enumerate(ls_models):
+            for mdl in ls_models:
                 # get first row associated with the model
                 models = self.index.get_by_model(mdl, return_if_found=True)
-                row = models.iloc[0]
+                record = handlers.record.get_records(models.iloc[:1], search=False)[0]
+
+                # skip items already split while searching
+                models = models.loc[models['Destination'] == constants.empty].copy()
+                if models.empty:
+                    self.progress.advance()
+                    continue
 
                 # split based on the model
-                file_name = self._split_pdf(row)
+                bytes_written = self.bytes_written
+                file_name = self._split_pdf(record, models.index)
 
                 # save destination for all models
-                models.loc[models['Destination']] = file_name
+                models['Destination'] = file_name
 
                 # update index
                 self.index.update(models)
 
-                # log execution stats
-                self.log_execution(n_processed=idx + 1, n_total=len(ls_models))
+                # report progress
+                self.progress.advance(n_pages=self._get_n_pages(record), n_bytes=self.bytes_written - bytes_written)
 
         else:
             logging.error(f"Split type {self.type} not recognized. Skipping split...")
 
-        logging.info(f"Done splitting PDFs.")
-        return self.index
+    def split_source(self, pdf: handlers.pdf.PdfHandler) -> None:
+        """
+        Splits all items found in a PDF which have a page range, so splitting can start before the search finishes.
+        :param pdf: The PDF to split.
+        """
+        if self.archive is None:
+            self.archive = self._open_archive()
+        if self.writer is None:
+            self.writer = self._open_writer()
 
-    def _split_pdf(self, row: pandas.DataFrame) -> str:
+        records = handlers.record.get_records(self.index.get_by_source(pdf, sort=True), search=False)
+        records = [record for record in records
+                   if record.last_page != constants.not_found and record.destination == constants.empty]
+
+        if self.type == 'model':
+            # split once per model, on the first item of the model in the pdf
+            models = {}
+            for record in records:
+                models.setdefault(record.model, []).append(record)
+
+            for model_records in models.values():
+                file_name = self._split_pdf(model_records[0], [record.item for record in model_records])
+                for record in model_records:
+                    record.destination = file_name
+        else:
+            for record in records:
+                record.destination = self._split_pdf(record)
+
+        self.index.update_records(records)
+        logging.info(f"Done splitting {len(records)} items from {pdf.name}.")
+
+    def _open_archive(self) -> handlers.archive.SplitArchive | None:
+        """
+        Opens the split archive if the output mode is an archive type.
+        :return: The split archive or None if writing separate files.
         """
-        Splits a PDF based on the page range in row.
-        :param row: The row to split the PDF on.
+        if self.output_mode not in constants.archive_types:
+            return None
+
+        archive_path = self.output_folder / f'{constants.split_archive}.{self.output_mode}'
+        return handlers.archive.SplitArchive(archive_path, self.output_mode)
+
+    def _open_writer(self) -> handlers.writer.SplitWriter | None:
+        """
+        Opens the split writer if writing separate files.
+        :return: The split writer or None if writing an archive.
+        """
+        if self.output_mode in constants.archive_types:
+            return None
+
+        return handlers.writer.SplitWriter(self.n_writers, self.max_in_flight)
+
+    def _close_writer(self) -> None:
+        """
+        Waits for all split files to be written, and sets the destination of files which could not be written to error.
+        """
+        self.writer.close()
+        self.writer = None
+        self._save_writes(wait=True)
+
+        for file_name in self._failed:
+            rows = self.index.get_by_destination(file_name, sort=False).copy()
+            rows['Destination'] = constants.error
+            self.index.update(rows)
+        self._failed = []
+
+    def _save_writes(self, wait: bool = False) -> None:
+        """
+        Commits the destinations of written files to the run store, so it never holds a file which was not written.
+        :param wait: Whether to wait for all queued files, otherwise only files written so far are committed.
+        """
+        while self._writes and (wait or self._writes[0][2].done()):
+            file_name, items, write = self._writes.popleft()
+            if write.result():
+                self._save_destination(items, file_name)
+            else:
+                self._failed.append(file_name)
+                self._save_destination(items, constants.error)
+
+    def _save_destination(self, items, destination: str) -> None:
+        if self.store is not None:
+            for item in items:
+                self.store.add_destination(item, destination)
+
+    def _split_pdf(self, record: handlers.record.TagRecord, items=None) -> str:
+        """
+        Splits a PDF based on the page range in record.
+        :param record: The record to split the PDF on.
+        :param items: The index of the items split to the PDF, None for the item of the record only.
         :return: The destination file name or applicable error.
         """
+        if items is None:
+            items = [record.item]
+
         # check if found
-        if row['First Page'] == constants.not_found:
+        if not record.found:
+            self._save_destination(items, constants.not_applicable)
             return constants.not_applicable
 
         # generate file name
-        file_name = self._generate_file_name(row)
+        file_name = self._generate_file_name(record)
+
+        # split into archive, destination is the file name as for separate files
+        if self.archive is not None:
+            destination = self._split_to_archive(record, file_name)
+            self._save_destination(items, destination)
+            return destination
 
         # create output path
         output_path = self.output_folder / f'{file_name}.pdf'
 
         # split and write to file
-        # check if file exists
-        if output_path.is_file():
+        # check if file is waiting to be written, before it exists in full
+        if output_path in self.writer:
+            logging.warning(f"File {output_path} already exists, skipping split...")
+            self._writes.append((file_name, items, self.writer.writes[output_path]))
+        elif output_path.is_file():
             logging.warning(f"File {output_path} already exists, skipping split...")
+            self._save_destination(items, file_name)
         else:
-            # return file_name if able to write to file
-            if row['Source'].split(row['First Page'], row['Last Page'], output_path):
-                return file_name
-            else:
-                return constants.error
+            # the destination is committed once the file has been written
+            data = record.source.serialise(record.first_page, record.last_page)
+            self._writes.append((file_name, items, self.writer.submit(output_path, data)))
+            self.bytes_written += len(data)
+
+        self._save_writes()
+        return file_name
+
+    def _split_to_archive(self, record: handlers.record.TagRecord, file_name: str) -> str:
+        """
+        Splits a PDF based on the page range in record and appends it to the split archive.
+        :param record: The record to split the PDF on.
+        :param file_name: The file name of the split PDF, the member name without extension.
+        :return: The file name or applicable error.
+        """
+        # check if member has already been written
+        member = f'{file_name}.pdf'
+        if member in self.archive:
+            logging.warning(f"Member {member} already exists in {self.archive.path.name}, skipping split...")
+            return file_name
+
+        if record.source.split_to_archive(record.first_page, record.last_page, self.archive, member):
+            self.bytes_written += self.archive.manifest[-1][-1]
+            return file_name
+        else:
+            return constants.error
+
+    @staticmethod
+    def _get_n_pages(record: handlers.record.TagRecord) -> int:
+        if record.first_page == constants.not_found or record.last_page == constants.not_found:
+            return 0
+        return record.last_page - record.first_page
 
-    def _generate_file_name(self, row: pandas.DataFrame) -> str:
+    def _generate_file_name(self, record: handlers.record.TagRecord) -> str:
         """
         Generates a file name based on the split type and item.
-        :param row: The row to write a file name for.
+        :param record: The record to write a file name for.
         :return: The filename.
         """
         # generate output file name
         if self.type == 'tag':
-            file_name = handlers.tag.create_file_name(row['Tag No'])
+            file_name = handlers.tag.create_file_name(record.tag)
         elif self.type == 'model':
-            file_name = handlers.model.create_file_name(row['Model'])
+            file_name = handlers.model.create_file_name(record.model)
         else:
             logging.error(f"Search type {self.type} not recognized.")
-            file_name = handlers.tag.create_file_name(row['Tag No'])
+            file_name = handlers.tag.create_file_name(record.tag)
         return file_name